@@ -1,16 +1,70 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
+import anyio
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
+from dotenv import load_dotenv
 
-from routers import recommend as recommendations
+# Read .env once, before the service modules snapshot their configuration at import.
+load_dotenv()
+
+from routers import recommend as recommendations  # noqa: E402
+from services.item2vec_client import warm_item2vec_assets  # noqa: E402
+from services.openai_client import persist_semantic_cache, restore_semantic_cache  # noqa: E402
+
+LOG = logging.getLogger(__name__)
+
+THREADPOOL_SIZE = int(os.getenv("BOOKBRIDGE_THREADPOOL_SIZE") or 64)
+# Interactive docs and the OpenAPI schema are for local development; the container turns them off.
+DOCS_ENABLED = (os.getenv("BOOKBRIDGE_DOCS_ENABLED") or "1") != "0"
+
+
+async def _warm_assets(app: FastAPI) -> None:
+    """Load item2vec assets off the event loop and flag the app ready once done."""
+    try:
+        await run_in_threadpool(warm_item2vec_assets)
+    except Exception:
+        LOG.exception("Failed to warm item2vec assets")
+        return
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Fail fast at startup instead of re-checking the key on every request.
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("OPENAI_API_KEY environment variable is not set.")
+    # Blocking service calls run in anyio's worker threads; the default of 40 caps concurrency.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    app.state.ready = False
+    await run_in_threadpool(restore_semantic_cache)
+    warmup = asyncio.create_task(_warm_assets(app))
+    yield
+    warmup.cancel()
+    await run_in_threadpool(persist_semantic_cache)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="BookBridge API")
+    app = FastAPI(
+        title="BookBridge API",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+        docs_url="/docs" if DOCS_ENABLED else None,
+        redoc_url="/redoc" if DOCS_ENABLED else None,
+        openapi_url="/openapi.json" if DOCS_ENABLED else None,
+        # Clients call exact paths; skip the extra 307 round-trip for trailing slashes.
+        redirect_slashes=False,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -19,12 +73,20 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Recommendation payloads are several KB of repetitive JSON; small bodies skip compression.
+    app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
 
     @app.get("/", tags=["health"])
     @app.get("/health", tags=["health"])
     async def health_check() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/ready", tags=["health"])
+    async def readiness_check() -> ORJSONResponse:
+        if not getattr(app.state, "ready", False):
+            return ORJSONResponse(status_code=503, content={"status": "warming"})
+        return ORJSONResponse(content={"status": "ready"})
+
     app.include_router(recommendations.router)
 
     return app
@@ -35,4 +97,12 @@ app = create_app()
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8080"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # uvloop/httptools come from uvicorn[standard]; Cloud Run already logs each request.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+    )
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import math
 import os
 import sys
 from pathlib import Path
 from typing import List, Optional
 
+from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
@@ -15,7 +19,8 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from services.item2vec_client import Item2VecError, get_book_details, get_final_book_ids
-from services.openai_client import generate_book_candidates
+from services.openai_client import agenerate_book_candidates, generate_book_candidates
+from services.rate_limiter import RateLimitExceeded
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
@@ -34,30 +39,23 @@ class BookInfo(BaseModel):
     primary_image: Optional[str] = None
 
 
-def _ensure_api_key_for_api() -> None:
-    """Validate presence of OPENAI_API_KEY for API requests."""
-    if not os.getenv("OPENAI_API_KEY"):
-        raise HTTPException(
-            status_code=500,
-            detail="OPENAI_API_KEY environment variable is not set.",
-        )
-
-
-@router.post("", response_model=List[BookInfo])
-async def recommend_books(body: RecommendRequest) -> List[BookInfo]:
+@router.post("", response_class=ORJSONResponse, responses={200: {"model": List[BookInfo]}})
+async def recommend_books(body: RecommendRequest) -> ORJSONResponse:
     """
     Generate book recommendations for the provided prompt.
 
     Returns a list of book info objects ordered from most recommended to least recommended.
     """
-    _ensure_api_key_for_api()
-
     try:
-        candidates = generate_book_candidates(body.prompt, history=body.history)
-        book_ids = get_final_book_ids(candidates)
-        return get_book_details(book_ids)
-    except HTTPException:
-        raise
+        candidates = await agenerate_book_candidates(body.prompt, history=body.history)
+        book_ids = await run_in_threadpool(get_final_book_ids, candidates)
+        details = await run_in_threadpool(get_book_details, book_ids)
+        return ORJSONResponse(content=details)
+    except RateLimitExceeded as exc:
+        retry_after = str(math.ceil(exc.retry_after))
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": retry_after}
+        ) from exc
     except Item2VecError as exc:
         raise HTTPException(status_code=502, detail=f"Item2Vec failed: {exc}") from exc
     except Exception as exc:  # pragma: no cover - surfaced to client
@@ -83,6 +81,8 @@ def _cli_test(prompt: str, history: Optional[List[str]] = None) -> None:
 
 
 if __name__ == "__main__":
+    # Only api.main loads .env for the server; the CLI needs it for OPENAI_API_KEY too.
+    load_dotenv()
     SAMPLE_PROMPT = "I like love stories set in historical Europe. Recommend some books."
     SAMPLE_HISTORY = []
     try:
@@ -16,9 +16,53 @@ from typing import Tuple
 from pyspark.sql import DataFrame, SparkSession
 from pyspark.sql import functions as F
 from pyspark.sql.functions import broadcast
+from pyspark.sql.types import (
+    ArrayType,
+    BooleanType,
+    DoubleType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+)
 
 LOG = logging.getLogger("bookbridge_etl")
 
+# Explicit schemas skip Spark's full-scan inference and prune every unused field at read time.
+REVIEWS_SCHEMA = StructType(
+    [
+        StructField("asin", StringType()),
+        StructField("user_id", StringType()),
+        StructField("timestamp", LongType()),
+        StructField("verified_purchase", BooleanType()),
+    ]
+)
+META_SCHEMA = StructType(
+    [
+        StructField("parent_asin", StringType()),
+        StructField("title", StringType()),
+        StructField("main_category", StringType()),
+        StructField("average_rating", DoubleType()),
+        StructField("rating_number", LongType()),
+        StructField("description", ArrayType(StringType())),
+        StructField("categories", ArrayType(StringType())),
+        StructField("author", StructType([StructField("name", StringType())])),
+        StructField(
+            "images",
+            ArrayType(
+                StructType(
+                    [
+                        StructField("thumb", StringType()),
+                        StructField("large", StringType()),
+                        StructField("variant", StringType()),
+                        StructField("hi_res", StringType()),
+                    ]
+                )
+            ),
+        ),
+    ]
+)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="BookBridge ETL for Dataproc")
@@ -27,13 +71,25 @@ def parse_args() -> argparse.Namespace:
         default="book_bridge",
         help="GCS bucket (without gs://) used for default input/output paths",
     )
+    parser.add_argument(
+        "--input-format",
+        choices=("json", "parquet"),
+        default="json",
+        help="Format of the reviews/metadata inputs; parquet enables column pruning",
+    )
     parser.add_argument(
         "--reviews-path",
-        help="GCS path to reviews JSONL; defaults to gs://<bucket>/Books.jsonl",
+        help="GCS path to reviews; defaults to gs://<bucket>/Books.jsonl (or Books.parquet)",
     )
     parser.add_argument(
         "--meta-path",
-        help="GCS path to metadata JSONL; defaults to gs://<bucket>/meta_Books.jsonl",
+        help="GCS path to metadata; defaults to gs://<bucket>/meta_Books.jsonl (or meta_Books.parquet)",
+    )
+    parser.add_argument(
+        "--write-parquet",
+        action="store_true",
+        help="Also write the pruned JSON inputs to gs://<bucket>/Books.parquet and "
+        "gs://<bucket>/meta_Books.parquet for later --input-format parquet runs",
     )
     parser.add_argument(
         "--training-output",
@@ -55,6 +111,12 @@ def parse_args() -> argparse.Namespace:
         default=3,
         help="Minimum user history length to keep for item2vec training",
     )
+    parser.add_argument(
+        "--metadata-partitions",
+        type=int,
+        default=16,
+        help="Number of part files written for the filtered metadata",
+    )
     parser.add_argument(
         "--app-name",
         default="BookBridge_ETL",
@@ -79,13 +141,28 @@ def build_spark(app_name: str) -> SparkSession:
 
 def derive_paths(args: argparse.Namespace) -> Tuple[str, str, str, str]:
     bucket = args.bucket
-    reviews_path = args.reviews_path or f"gs://{bucket}/Books.jsonl"
-    meta_path = args.meta_path or f"gs://{bucket}/meta_Books.jsonl"
+    extension = "parquet" if args.input_format == "parquet" else "jsonl"
+    reviews_path = args.reviews_path or f"gs://{bucket}/Books.{extension}"
+    meta_path = args.meta_path or f"gs://{bucket}/meta_Books.{extension}"
     training_output = args.training_output or f"gs://{bucket}/item2vec_training_data"
     metadata_output = args.metadata_output or f"gs://{bucket}/filtered_metadata"
     return reviews_path, meta_path, training_output, metadata_output
 
 
+def load_input(spark: SparkSession, path: str, schema: StructType, input_format: str) -> DataFrame:
+    """Read only the schema's columns from a JSON or Parquet input."""
+    if input_format == "parquet":
+        df = spark.read.parquet(path)
+    else:
+        df = spark.read.schema(schema).json(path)
+    return df.select(*schema.fieldNames())
+
+
+def write_parquet(df: DataFrame, output_path: str) -> None:
+    LOG.info("Writing Parquet copy to %s", output_path)
+    df.write.mode("overwrite").parquet(output_path)
+
+
 def compute_top_books(reviews_df: DataFrame, top_k: int) -> Tuple[DataFrame, DataFrame]:
     """Filter verified purchases and compute the top-K book ASINs."""
     verified_df = reviews_df.filter(F.col("verified_purchase") == True)
@@ -107,12 +184,15 @@ def build_training_sequences(
 ) -> DataFrame:
     """Create space-separated ASIN sequences per user for item2vec."""
     filtered_reviews = verified_reviews.join(broadcast(top_books), "asin", "inner")
+    # Order each user's history inside the aggregation: a global orderBy sorts the whole
+    # dataset and its order is not guaranteed to survive the groupBy shuffle anyway.
     sequences = (
-        filtered_reviews.orderBy("timestamp")
-        .groupBy("user_id")
-        .agg(F.collect_list("asin").alias("item_sequence"))
-        .filter(F.size(F.col("item_sequence")) >= min_len)
-        .select(F.concat_ws(" ", "item_sequence").alias("sentence"))
+        filtered_reviews.groupBy("user_id")
+        .agg(F.array_sort(F.collect_list(F.struct("timestamp", "asin"))).alias("events"))
+        .filter(F.size(F.col("events")) >= min_len)
+        .select(
+            F.concat_ws(" ", F.transform("events", lambda event: event["asin"])).alias("sentence")
+        )
     )
     total_sequences = sequences.count()
     LOG.info("Users with valid sequences: %s", total_sequences)
@@ -143,9 +223,10 @@ def write_training_data(training_df: DataFrame, output_path: str) -> None:
     training_df.write.mode("overwrite").text(output_path, compression="gzip")
 
 
-def write_metadata(filtered_meta: DataFrame, output_path: str) -> None:
-    LOG.info("Writing filtered metadata to %s", output_path)
-    filtered_meta.coalesce(1).write.mode("overwrite").json(output_path)
+def write_metadata(filtered_meta: DataFrame, output_path: str, num_partitions: int) -> None:
+    # Sharded output keeps the write parallel; the API downloads every part file under the prefix.
+    LOG.info("Writing filtered metadata to %s (%s partitions)", output_path, num_partitions)
+    filtered_meta.repartition(num_partitions).write.mode("overwrite").json(output_path)
 
 
 def main() -> None:
@@ -156,10 +237,14 @@ def main() -> None:
     spark = build_spark(args.app_name)
     try:
         LOG.info("Loading reviews from %s", reviews_path)
-        reviews_df = spark.read.json(reviews_path)
+        reviews_df = load_input(spark, reviews_path, REVIEWS_SCHEMA, args.input_format)
 
         LOG.info("Loading metadata from %s", meta_path)
-        meta_df = spark.read.json(meta_path)
+        meta_df = load_input(spark, meta_path, META_SCHEMA, args.input_format)
+
+        if args.write_parquet and args.input_format == "json":
+            write_parquet(reviews_df, f"gs://{args.bucket}/Books.parquet")
+            write_parquet(meta_df, f"gs://{args.bucket}/meta_Books.parquet")
 
         verified_reviews, top_books = compute_top_books(reviews_df, args.top_k)
 
@@ -169,7 +254,7 @@ def main() -> None:
         write_training_data(training_sequences, training_output)
 
         filtered_meta = clean_metadata(meta_df, top_books)
-        write_metadata(filtered_meta, metadata_output)
+        write_metadata(filtered_meta, metadata_output, args.metadata_partitions)
     finally:
         spark.stop()
         LOG.info("Spark application stopped")
@@ -5,23 +5,54 @@ from __future__ import annotations
 import json
 import logging
 import os
-import re
-import heapq
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, MutableMapping, Sequence, Tuple
-
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import faiss
+import marisa_trie
+import numpy as np
+import pyarrow as pa
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
-from gensim.models import KeyedVectors
+from google.cloud.storage import transfer_manager
+from pyarrow import json as pa_json
 
 LOG = logging.getLogger(__name__)
 
 DEFAULT_BUCKET = os.getenv("BOOKBRIDGE_GCS_BUCKET") or "book_bridge"
-DEFAULT_EMBEDDINGS_BLOB = os.getenv("BOOKBRIDGE_EMBEDDINGS_BLOB") or "models/item_embeddings.kv"
+DEFAULT_VECTORS_BLOB = os.getenv("BOOKBRIDGE_VECTORS_BLOB") or "models/item_vectors.npy"
+DEFAULT_VECTOR_KEYS_BLOB = os.getenv("BOOKBRIDGE_VECTOR_KEYS_BLOB") or "models/item_keys.json"
+# Set to an empty string to fall back to exact (brute-force) neighbour search.
+DEFAULT_HNSW_INDEX_BLOB = os.getenv("BOOKBRIDGE_HNSW_INDEX_BLOB", "models/item_vectors.hnsw")
+DEFAULT_HNSW_EF_SEARCH = int(os.getenv("BOOKBRIDGE_HNSW_EF_SEARCH") or 128)
 DEFAULT_TITLE_INDEX_BLOB = os.getenv("BOOKBRIDGE_TITLE_TO_ID_BLOB") or "indexes/title_to_id_index.json"
 DEFAULT_METADATA_PREFIX = os.getenv("BOOKBRIDGE_METADATA_PREFIX") or "filtered_metadata"
 DEFAULT_CACHE_DIR = Path(os.getenv("BOOKBRIDGE_CACHE_DIR") or "/tmp/bookbridge_cache")
+DEFAULT_DOWNLOAD_WORKERS = int(os.getenv("BOOKBRIDGE_DOWNLOAD_WORKERS") or 16)
+# Blobs at least this large are fetched as concurrent ranged reads instead of one stream.
+DEFAULT_CHUNKED_DOWNLOAD_BYTES = int(os.getenv("BOOKBRIDGE_CHUNKED_DOWNLOAD_BYTES") or 64 * 1024 * 1024)
+DEFAULT_DOWNLOAD_CHUNK_BYTES = int(os.getenv("BOOKBRIDGE_DOWNLOAD_CHUNK_BYTES") or 32 * 1024 * 1024)
+
+# Every ASCII byte except [a-z0-9]; non-ASCII characters are dropped by the encode step.
+_NON_ALNUM_BYTES = bytes(c for c in range(128) if not (48 <= c <= 57 or 97 <= c <= 122))
+
+# Only the fields surfaced by get_book_details are materialized from metadata shards.
+METADATA_FIELDS = ("asin", "title", "author_name", "average_rating", "rating_number", "primary_image")
 
 
 class Item2VecError(RuntimeError):
@@ -32,13 +63,39 @@ class Item2VecError(RuntimeError):
 class Item2VecAssets:
     metadata_dir: Path
     title_index_path: Path
-    embeddings_path: Path
+    vectors_path: Path
+    vector_keys_path: Path
+    ann_index_path: Optional[Path] = None
+
+
+@dataclass(frozen=True)
+class ItemVectors:
+    """Unit-length item embeddings with their id <-> row lookups."""
+
+    vectors: np.ndarray
+    index_to_key: Sequence[str]
+    key_to_index: Mapping[str, int]
+    ann_index: Optional[faiss.Index] = None
+
+
+class BookRow(NamedTuple):
+    """Display fields for one book, resolved once when the metadata index loads."""
+
+    title: str
+    author_name: str
+    average_rating: Optional[float]
+    rating_number: Optional[int]
+    primary_image: Any
+
+
+_MISSING_BOOK = BookRow("Unknown Title", "Unknown Author", None, None, None)
 
 
 def _normalize_title(title: str) -> str:
+    # Same result as re.sub(r"[^a-z0-9]", "", title.lower()), done in C by bytes.translate.
     if not title:
         return ""
-    return re.sub(r"[^a-z0-9]", "", title.lower())
+    return title.lower().encode("ascii", "ignore").translate(None, _NON_ALNUM_BYTES).decode("ascii")
 
 
 def _has_files(directory: Path) -> bool:
@@ -56,14 +113,24 @@ def _download_blob_if_needed(
         return
     LOG.info("Downloading %s to %s", blob_name, destination)
     blob = bucket.blob(blob_name)
+    # reload() both checks existence and fetches the size in one metadata request.
     try:
-        exists = blob.exists()
+        blob.reload()
+    except NotFound as exc:
+        raise Item2VecError(f"GCS object not found: {blob_name}") from exc
     except Exception as exc:
         raise Item2VecError(f"Error checking GCS object {blob_name}: {exc}") from exc
-    if not exists:
-        raise Item2VecError(f"GCS object not found: {blob_name}")
     try:
-        blob.download_to_filename(destination)
+        if (blob.size or 0) >= DEFAULT_CHUNKED_DOWNLOAD_BYTES:
+            transfer_manager.download_chunks_concurrently(
+                blob,
+                str(destination),
+                chunk_size=DEFAULT_DOWNLOAD_CHUNK_BYTES,
+                worker_type=transfer_manager.THREAD,
+                max_workers=DEFAULT_DOWNLOAD_WORKERS,
+            )
+        else:
+            blob.download_to_filename(destination)
     except Exception as exc:
         raise Item2VecError(f"Failed to download {blob_name}: {exc}") from exc
 
@@ -85,9 +152,7 @@ def _download_prefix_if_needed(
     if not blobs:
         raise Item2VecError(f"No objects found under prefix: {normalized_prefix}")
 
-    for blob in blobs:
-        if blob.name.endswith("/"):
-            continue
+    def _download(blob: storage.Blob) -> None:
         relative_name = Path(blob.name[len(normalized_prefix) :])
         target_path = destination_dir / relative_name
         target_path.parent.mkdir(parents=True, exist_ok=True)
@@ -97,6 +162,12 @@ def _download_prefix_if_needed(
         except Exception as exc:
             raise Item2VecError(f"Failed to download {blob.name}: {exc}") from exc
 
+    # Shards are independent, so fetch them concurrently instead of paying one RTT each.
+    files = [blob for blob in blobs if not blob.name.endswith("/")]
+    with ThreadPoolExecutor(max_workers=max(1, min(DEFAULT_DOWNLOAD_WORKERS, len(files)))) as pool:
+        for future in [pool.submit(_download, blob) for blob in files]:
+            future.result()
+
 
 def download_item2vec_assets(
     *,
@@ -113,14 +184,24 @@ def download_item2vec_assets(
     cache_dir = DEFAULT_CACHE_DIR
     metadata_dir = cache_dir / Path(DEFAULT_METADATA_PREFIX).name
     title_index_path = cache_dir / Path(DEFAULT_TITLE_INDEX_BLOB).name
-    embeddings_path = cache_dir / Path(DEFAULT_EMBEDDINGS_BLOB).name
+    vectors_path = cache_dir / Path(DEFAULT_VECTORS_BLOB).name
+    vector_keys_path = cache_dir / Path(DEFAULT_VECTOR_KEYS_BLOB).name
+    ann_index_path = cache_dir / Path(DEFAULT_HNSW_INDEX_BLOB).name if DEFAULT_HNSW_INDEX_BLOB else None
 
     assets = Item2VecAssets(
-        metadata_dir=metadata_dir, title_index_path=title_index_path, embeddings_path=embeddings_path
+        metadata_dir=metadata_dir,
+        title_index_path=title_index_path,
+        vectors_path=vectors_path,
+        vector_keys_path=vector_keys_path,
+        ann_index_path=ann_index_path,
     )
 
     needs_download = force or not (
-        title_index_path.exists() and embeddings_path.exists() and (not include_metadata or _has_files(metadata_dir))
+        title_index_path.exists()
+        and vectors_path.exists()
+        and vector_keys_path.exists()
+        and (ann_index_path is None or ann_index_path.exists())
+        and (not include_metadata or _has_files(metadata_dir))
     )
     if not needs_download:
         return assets
@@ -131,10 +212,25 @@ def download_item2vec_assets(
     except Exception as exc:  # pragma: no cover - environment specific
         raise Item2VecError(f"Failed to init GCS client: {exc}") from exc
 
-    _download_blob_if_needed(bucket, DEFAULT_TITLE_INDEX_BLOB, title_index_path, force)
-    _download_blob_if_needed(bucket, DEFAULT_EMBEDDINGS_BLOB, embeddings_path, force)
-    if include_metadata:
-        _download_prefix_if_needed(bucket, DEFAULT_METADATA_PREFIX, metadata_dir, force)
+    blobs = [
+        (DEFAULT_TITLE_INDEX_BLOB, title_index_path),
+        (DEFAULT_VECTORS_BLOB, vectors_path),
+        (DEFAULT_VECTOR_KEYS_BLOB, vector_keys_path),
+    ]
+    if ann_index_path is not None:
+        blobs.append((DEFAULT_HNSW_INDEX_BLOB, ann_index_path))
+    # The assets are independent, so fetch them (and the metadata shards) side by side.
+    with ThreadPoolExecutor(max_workers=len(blobs) + 1) as pool:
+        futures = [
+            pool.submit(_download_blob_if_needed, bucket, blob_name, path, force)
+            for blob_name, path in blobs
+        ]
+        if include_metadata:
+            futures.append(
+                pool.submit(_download_prefix_if_needed, bucket, DEFAULT_METADATA_PREFIX, metadata_dir, force)
+            )
+        for future in futures:
+            future.result()
 
     return assets
 
@@ -153,27 +249,78 @@ def _load_json(path: Path) -> MutableMapping[str, str]:
     return data
 
 
+class TitleIndex(Mapping[str, str]):
+    """Read-only normalized title -> book_id mapping backed by a memory-mapped marisa trie."""
+
+    def __init__(self, trie: marisa_trie.BytesTrie):
+        self._trie = trie
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        values = self._trie.get(key)
+        return values[0].decode("utf-8") if values else default
+
+    def __getitem__(self, key: str) -> str:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key in self._trie
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._trie.keys())
+
+    def __len__(self) -> int:
+        return len(self._trie)
+
+
+def _unique_tmp_path(target: Path) -> Path:
+    """Reserve a temp file next to ``target``; each worker gets its own, so renames never race."""
+    fd, name = tempfile.mkstemp(dir=target.parent, prefix=target.name + ".", suffix=".tmp")
+    os.close(fd)
+    return Path(name)
+
+
+def _build_title_trie(json_path: Path, trie_path: Path) -> None:
+    data = _load_json(json_path)
+    # Keys are normalized by the index build with the same rule as _normalize_title.
+    items = ((str(k), str(v).encode("utf-8")) for k, v in data.items())
+    trie = marisa_trie.BytesTrie(items)
+    tmp_path = _unique_tmp_path(trie_path)
+    try:
+        trie.save(str(tmp_path))
+        os.replace(tmp_path, trie_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 @lru_cache(maxsize=1)
 def load_title_index(path: Path | str) -> Mapping[str, str]:
     """
     Load normalized title -> book_id mapping.
 
-    Cached to avoid repeated disk reads in Cloud Run.
+    The JSON index is compiled once into a marisa trie next to it and memory-mapped,
+    which is several times smaller than a dict of Python strings. Cached to avoid
+    repeated disk reads in Cloud Run.
     """
-    data = _load_json(Path(path))
-    # Keys are pre-normalized, but normalize again defensively.
-    return {_normalize_title(str(k)): str(v) for k, v in data.items()}
-
-
-@lru_cache(maxsize=1)
-def load_embeddings(path: Path | str) -> KeyedVectors:
-    """Load item2vec embeddings into memory (mmap for speed)."""
+    path = Path(path)
+    trie_path = path.with_suffix(".marisa")
     try:
-        return KeyedVectors.load(str(path), mmap="r")
+        stale = not trie_path.exists() or trie_path.stat().st_mtime < path.stat().st_mtime
     except FileNotFoundError as exc:
-        raise Item2VecError(f"Embeddings file not found: {path}") from exc
-    except Exception as exc:  # pragma: no cover - depends on local model file
-        raise Item2VecError(f"Failed to load embeddings: {exc}") from exc
+        raise Item2VecError(f"Missing required file: {path}") from exc
+    if stale:
+        LOG.info("Compiling title index %s into %s", path, trie_path)
+        _build_title_trie(path, trie_path)
+
+    trie = marisa_trie.BytesTrie()
+    try:
+        trie.mmap(str(trie_path))
+    except Exception as exc:  # pragma: no cover - corrupt trie on local disk
+        raise Item2VecError(f"Failed to load title index {trie_path}: {exc}") from exc
+    return TitleIndex(trie)
 
 
 def _iter_metadata_files(directory: Path) -> List[Path]:
@@ -186,44 +333,233 @@ def _iter_metadata_files(directory: Path) -> List[Path]:
     return files
 
 
-@lru_cache(maxsize=1)
-def load_metadata_index(metadata_dir: Path | str) -> Mapping[str, Dict[str, Any]]:
+def _read_metadata_lines(path: Path) -> List[Dict[str, Any]]:
+    """Parse a metadata shard record by record, skipping malformed lines."""
+    records: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def _read_metadata_records(path: Path) -> List[Dict[str, Any]]:
     """
-    Load metadata into an asin -> metadata mapping.
+    Parse a newline-delimited metadata shard with Arrow's C++ JSON reader.
 
-    Cached so repeated lookups are fast in Cloud Run.
+    Falls back to the line-by-line parser when Arrow rejects the shard (e.g. a
+    malformed line or an empty file).
     """
-    metadata_dir = Path(metadata_dir)
-    index: Dict[str, Dict[str, Any]] = {}
-    for path in _iter_metadata_files(metadata_dir):
-        try:
-            with path.open("r", encoding="utf-8") as handle:
-                for line in handle:
-                    if not line.strip():
-                        continue
-                    try:
-                        record = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    asin = record.get("asin")
-                    if asin:
-                        index[str(asin)] = record
-        except FileNotFoundError:
-            continue
-    if not index:
-        raise Item2VecError(f"No metadata records loaded from: {metadata_dir}")
-    return index
+    try:
+        table = pa_json.read_json(path)
+    except pa.ArrowInvalid as exc:
+        LOG.debug("Arrow could not parse %s (%s); parsing line by line", path, exc)
+        return _read_metadata_lines(path)
+    columns = [name for name in METADATA_FIELDS if name in table.column_names]
+    return table.select(columns).to_pylist()
 
 
 def _extract_primary_image(entry: Mapping[str, Any]) -> Any:
     img = entry.get("primary_image")
     if isinstance(img, dict):
+        # Arrow structs carry every field, so absent sizes show up as None.
         for key in ("large", "medium", "small", "thumbnail"):
-            if key in img:
+            if img.get(key):
                 return img[key]
     return img
 
 
+def _to_book_row(record: Mapping[str, Any]) -> BookRow:
+    return BookRow(
+        # Arrow's JSON reader fills keys a record lacks with null, so fall back on falsy too.
+        title=record.get("title") or "Unknown Title",
+        author_name=record.get("author_name") or "Unknown Author",
+        average_rating=record.get("average_rating"),
+        rating_number=record.get("rating_number"),
+        primary_image=_extract_primary_image(record),
+    )
+
+
+_METADATA_SCHEMA = pa.schema(
+    [
+        ("asin", pa.string()),
+        ("title", pa.string()),
+        ("author_name", pa.string()),
+        ("average_rating", pa.float64()),
+        ("rating_number", pa.int64()),
+        ("primary_image", pa.string()),
+    ]
+)
+
+
+class MetadataIndex(Mapping[str, BookRow]):
+    """
+    Read-only asin -> BookRow mapping over a memory-mapped Arrow table.
+
+    Only the asin -> row dict lives on the Python heap; the columns stay in the
+    page cache, shared by every worker process that maps the same file.
+    """
+
+    def __init__(self, table: pa.Table):
+        self._table = table
+        self._rows = {asin: row for row, asin in enumerate(table.column("asin").to_pylist())}
+
+    def rows(self, book_ids: Sequence[str]) -> List[BookRow]:
+        """Resolve many IDs with one ``take``; unknown IDs map to the placeholder book."""
+        positions = [self._rows.get(book_id) for book_id in book_ids]
+        found = [pos for pos in positions if pos is not None]
+        records = iter(self._table.take(found).drop(["asin"]).to_pylist()) if found else iter(())
+        return [_MISSING_BOOK if pos is None else BookRow(**next(records)) for pos in positions]
+
+    def __getitem__(self, key: str) -> BookRow:
+        if key not in self._rows:
+            raise KeyError(key)
+        return self.rows([key])[0]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def _build_metadata_table(metadata_dir: Path, files: Sequence[Path], table_path: Path) -> None:
+    rows: Dict[str, Dict[str, Any]] = {}
+    for path in files:
+        try:
+            records = _read_metadata_records(path)
+        except FileNotFoundError:
+            continue
+        for record in records:
+            asin = record.get("asin")
+            if asin:
+                row = _to_book_row(record)._asdict()
+                if not isinstance(row["primary_image"], str):
+                    row["primary_image"] = None
+                rows[str(asin)] = {"asin": str(asin), **row}
+    if not rows:
+        raise Item2VecError(f"No metadata records loaded from: {metadata_dir}")
+
+    table = pa.Table.from_pylist(list(rows.values()), schema=_METADATA_SCHEMA)
+    tmp_path = _unique_tmp_path(table_path)
+    try:
+        with pa.ipc.new_file(str(tmp_path), table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, table_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@lru_cache(maxsize=1)
+def load_metadata_index(metadata_dir: Path | str) -> MetadataIndex:
+    """
+    Load metadata into an asin -> BookRow mapping.
+
+    The JSON shards are compiled once into an Arrow IPC file next to the directory
+    (rebuilt when a shard is newer) with display fields, including the primary image
+    URL, already resolved. The file is memory-mapped, so additional workers start
+    without re-parsing and share its pages.
+    """
+    metadata_dir = Path(metadata_dir)
+    files = _iter_metadata_files(metadata_dir)
+    table_path = metadata_dir.with_name(metadata_dir.name + ".arrow")
+    newest_shard = max(path.stat().st_mtime for path in files)
+    if not table_path.exists() or table_path.stat().st_mtime < newest_shard:
+        LOG.info("Compiling metadata shards in %s into %s", metadata_dir, table_path)
+        _build_metadata_table(metadata_dir, files, table_path)
+
+    try:
+        table = pa.ipc.open_file(pa.memory_map(str(table_path), "r")).read_all()
+    except Exception as exc:  # pragma: no cover - corrupt table on local disk
+        raise Item2VecError(f"Failed to load metadata table {table_path}: {exc}") from exc
+    return MetadataIndex(table)
+
+
+def _load_vector_keys(path: Path) -> List[str]:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            keys = json.load(handle)
+    except FileNotFoundError as exc:
+        raise Item2VecError(f"Missing required file: {path}") from exc
+    except json.JSONDecodeError as exc:
+        raise Item2VecError(f"Invalid JSON in {path}: {exc}") from exc
+
+    if not isinstance(keys, list):
+        raise Item2VecError(f"Expected list in {path}, got {type(keys)}")
+    return [str(key) for key in keys]
+
+
+def _load_ann_index(path: Path, vectors: np.ndarray) -> faiss.Index:
+    try:
+        index = faiss.read_index(str(path))
+    except Exception as exc:
+        raise Item2VecError(f"Failed to load HNSW index {path}: {exc}") from exc
+    if index.ntotal != vectors.shape[0] or index.d != vectors.shape[1]:
+        raise Item2VecError(
+            f"HNSW index in {path} holds {index.ntotal}x{index.d} vectors, "
+            f"expected {vectors.shape[0]}x{vectors.shape[1]}"
+        )
+    return index
+
+
+@lru_cache(maxsize=1)
+def load_item_vectors(
+    vectors_path: Path | str,
+    keys_path: Path | str,
+    ann_index_path: Path | str | None = None,
+) -> ItemVectors:
+    """
+    Memory-map the exported item vectors and their row-aligned book IDs.
+
+    The ``.npy`` holds unit-length float32 rows (exported by the Item2Vec notebook), so
+    cosine similarity is a plain dot product and loading is near-instant. float32 is kept
+    because NumPy only routes float32/float64 matmuls through BLAS. When ``ann_index_path``
+    is given, the notebook's FAISS HNSW graph over the same rows is loaded for
+    neighbour search.
+    """
+    try:
+        vectors = np.load(str(vectors_path), mmap_mode="r")
+    except FileNotFoundError as exc:
+        raise Item2VecError(f"Embeddings file not found: {vectors_path}") from exc
+    except Exception as exc:  # pragma: no cover - depends on local model file
+        raise Item2VecError(f"Failed to load embeddings: {exc}") from exc
+
+    keys = _load_vector_keys(Path(keys_path))
+    if vectors.ndim != 2 or vectors.shape[0] != len(keys):
+        raise Item2VecError(
+            f"Embeddings shape {vectors.shape} does not match {len(keys)} keys in {keys_path}"
+        )
+    ann_index = _load_ann_index(Path(ann_index_path), vectors) if ann_index_path else None
+    return ItemVectors(
+        vectors=vectors,
+        index_to_key=keys,
+        key_to_index={key: idx for idx, key in enumerate(keys)},
+        ann_index=ann_index,
+    )
+
+
+def warm_item2vec_assets(*, force_download: bool = False) -> Item2VecAssets:
+    """
+    Download assets and populate the cached loaders used on the request path.
+
+    Intended to run once at service startup so the first request does not pay for
+    GCS downloads, JSON parsing, and embedding loads.
+    """
+    assets = download_item2vec_assets(force=force_download, include_metadata=True)
+    load_title_index(assets.title_index_path)
+    load_item_vectors(assets.vectors_path, assets.vector_keys_path, assets.ann_index_path)
+    load_metadata_index(assets.metadata_dir)
+    return assets
+
+
 def get_book_details(
     book_ids: Sequence[str], *, force_download: bool = False
 ) -> List[Dict[str, Any]]:
@@ -232,21 +568,8 @@ def get_book_details(
     """
     assets = download_item2vec_assets(force=force_download, include_metadata=True)
     metadata = load_metadata_index(assets.metadata_dir)
-
-    details: List[Dict[str, Any]] = []
-    for book_id in book_ids:
-        entry = metadata.get(book_id, {})
-        details.append(
-            {
-                "asin": book_id,
-                "title": entry.get("title", "Unknown Title"),
-                "author_name": entry.get("author_name", "Unknown Author"),
-                "average_rating": entry.get("average_rating"),
-                "rating_number": entry.get("rating_number"),
-                "primary_image": _extract_primary_image(entry),
-            }
-        )
-    return details
+    rows = metadata.rows(book_ids)
+    return [{"asin": book_id, **row._asdict()} for book_id, row in zip(book_ids, rows)]
 
 
 def filter_existing_titles(
@@ -257,11 +580,9 @@ def filter_existing_titles(
     valid_ids: List[str] = []
     for rec in recommendations:
         raw_title = rec.get("title") if isinstance(rec, Mapping) else str(rec)
-        normalized = _normalize_title(raw_title)
-        if not normalized:
+        if not (normalized := _normalize_title(raw_title)):
             continue
-        book_id = title_index.get(normalized)
-        if book_id and book_id not in seen:
+        if (book_id := title_index.get(normalized)) and book_id not in seen:
             valid_ids.append(book_id)
             seen.add(book_id)
         else:
@@ -269,18 +590,61 @@ def filter_existing_titles(
     return valid_ids
 
 
-def _collect_similar(
-    model: KeyedVectors, seed_id: str, *, topn: int
-) -> List[Tuple[str, float]]:
-    if seed_id not in model.key_to_index:
-        LOG.debug("Seed ID missing from embeddings: %s", seed_id)
-        return []
-    return model.most_similar(seed_id, topn=topn)
+def _top_neighbors(
+    vectors: np.ndarray, seed_rows: np.ndarray, *, topn: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return each seed's ``topn`` nearest rows (excluding itself) and their cosine similarities.
+
+    All seeds are scored in one ``(S, D) @ (D, V)`` matmul, so the embedding matrix is
+    streamed through memory once per request instead of once per seed.
+    """
+    scores = vectors[seed_rows] @ vectors.T
+    scores[np.arange(len(seed_rows)), seed_rows] = -np.inf
+    k = min(topn, scores.shape[1] - 1)
+    if k <= 0:
+        empty = np.empty((len(seed_rows), 0))
+        return empty.astype(np.intp), empty.astype(scores.dtype)
+
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _ann_neighbors(
+    index: faiss.Index, vectors: np.ndarray, seed_rows: np.ndarray, *, topn: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Approximate ``_top_neighbors`` using a FAISS HNSW index over the same rows.
+
+    All seeds go through one ``index.search`` call. Each seed asks for ``topn + 1``
+    hits so that dropping its own row still leaves ``topn`` neighbours. Slots that
+    FAISS could not fill (row ``-1``) get a similarity of ``-inf``.
+    """
+    k = min(topn + 1, index.ntotal)
+    if k <= 1:
+        empty = np.empty((len(seed_rows), 0))
+        return empty.astype(np.intp), empty.astype(np.float32)
+
+    queries = np.ascontiguousarray(vectors[seed_rows], dtype=np.float32)
+    params = faiss.SearchParametersHNSW(efSearch=max(DEFAULT_HNSW_EF_SEARCH, k))
+    sims, rows = index.search(queries, k, params=params)
+
+    # Drop each seed's own row, or its weakest hit when the graph did not return it.
+    is_self = rows == seed_rows[:, None]
+    drop = np.where(is_self.any(axis=1), is_self.argmax(axis=1), k - 1)
+    keep = np.ones(rows.shape, dtype=bool)
+    keep[np.arange(len(seed_rows)), drop] = False
+    rows = rows[keep].reshape(len(seed_rows), k - 1)
+    sims = sims[keep].reshape(len(seed_rows), k - 1)
+    sims[rows < 0] = -np.inf
+    return rows, sims
 
 
 def rerank_with_item2vec(
     seed_book_ids: Sequence[str],
-    model: KeyedVectors,
+    vectors: ItemVectors,
     *,
     topn_per_seed: int = 50,
     final_k: int = 10,
@@ -289,24 +653,44 @@ def rerank_with_item2vec(
 ) -> List[str]:
     """
     Collect per-seed neighbors, keep the best similarity per book, and return a global top-K.
+
+    Seeds (similarity 1.0) lead in input order; neighbor scores (from the HNSW index when
+    loaded, otherwise an exact matmul) are reduced into a dense per-item array and the
+    remaining slots are filled with an ``argpartition`` selection.
     """
-    best_scores: Dict[str, float] = {}
+    seeds = list(dict.fromkeys(seed_book_ids))
+    ranked: List[str] = seeds[:final_k] if include_seed_titles else []
+
+    seed_rows: List[int] = []
+    for seed_id in seeds:
+        row = vectors.key_to_index.get(seed_id)
+        if row is None:
+            LOG.debug("Seed ID missing from embeddings: %s", seed_id)
+        else:
+            seed_rows.append(row)
 
-    for seed_id in seed_book_ids:
-        if include_seed_titles:
-            existing = best_scores.get(seed_id)
-            if existing is None or 1.0 > existing:
-                best_scores[seed_id] = 1.0
+    remaining = final_k - len(ranked)
+    if not seed_rows or remaining <= 0:
+        return ranked
 
-        for rec_id, similarity in _collect_similar(model, seed_id, topn=topn_per_seed):
-            if similarity < min_similarity:
-                continue
-            existing = best_scores.get(rec_id)
-            if existing is None or similarity > existing:
-                best_scores[rec_id] = similarity
+    seed_array = np.asarray(seed_rows, dtype=np.intp)
+    if vectors.ann_index is not None:
+        neighbor_rows, similarities = _ann_neighbors(
+            vectors.ann_index, vectors.vectors, seed_array, topn=topn_per_seed
+        )
+    else:
+        neighbor_rows, similarities = _top_neighbors(vectors.vectors, seed_array, topn=topn_per_seed)
+    keep = similarities >= min_similarity
+    scores = np.full(len(vectors.index_to_key), -np.inf, dtype=np.float32)
+    np.maximum.at(scores, neighbor_rows[keep], similarities[keep])
+    if include_seed_titles:
+        scores[seed_rows] = -np.inf
 
-    top_items = heapq.nlargest(final_k, best_scores.items(), key=lambda item: item[1])
-    return [book_id for book_id, _ in top_items]
+    candidates = np.flatnonzero(np.isfinite(scores))
+    if len(candidates) > remaining:
+        candidates = np.sort(candidates[np.argpartition(-scores[candidates], remaining - 1)[:remaining]])
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return ranked + [vectors.index_to_key[row] for row in candidates.tolist()]
 
 
 def get_final_book_ids(
@@ -332,5 +716,5 @@ def get_final_book_ids(
         LOG.warning("No recommendations matched the catalog; returning empty result.")
         return []
 
-    model = load_embeddings(assets.embeddings_path)
-    return rerank_with_item2vec(seed_ids, model, topn_per_seed=topn_per_seed, final_k=final_k)
+    vectors = load_item_vectors(assets.vectors_path, assets.vector_keys_path, assets.ann_index_path)
+    return rerank_with_item2vec(seed_ids, vectors, topn_per_seed=topn_per_seed, final_k=final_k)
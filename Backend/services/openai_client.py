@@ -2,129 +2,713 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import json
-from typing import Any, Dict, List, Optional
+import logging
+import os
+import re
+import time
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Sequence, Type, TypeVar
 
-from dotenv import load_dotenv
-from openai import OpenAI
+import httpx
+import numpy as np
+import orjson
+from diskcache import Cache
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from pydantic import BaseModel, Field, ValidationError
 
-load_dotenv()
+from services.rate_limiter import TokenBucket
+from services.response_cache import ExactMatchCache, SemanticCache, normalize_embedding
+from services.text_cleaning import MAX_RECOMMENDATIONS
+from services.text_cleaning import clean_recommendations as _clean_recommendations
+from services.text_cleaning import clean_title as _clean_title
 
-_client = OpenAI()
-_DEFAULT_MODEL = "gpt-4.1-mini"
-_RESPONSE_FORMAT = {
+LOG = logging.getLogger(__name__)
+
+# Pooled HTTP/2 clients shared by every request, so concurrent calls multiplex over
+# warm connections instead of each paying a TLS handshake. The sync client serves the
+# threadpool endpoints, embeddings, and the batch helpers.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+# Built on first use so importing this module never needs an API key or network setup.
+_client: Optional[OpenAI] = None
+_aclient: Optional[AsyncOpenAI] = None
+# Override (e.g. gpt-4o-mini) to A/B a cheaper model against the item2vec rerank.
+_DEFAULT_MODEL = os.getenv("BOOKBRIDGE_OPENAI_MODEL") or "gpt-4.1-mini"
+# Set to 0 to roll back from the Responses API to chat.completions for interactive calls.
+_USE_RESPONSES_API = (os.getenv("BOOKBRIDGE_OPENAI_RESPONSES_API") or "1") != "0"
+_EMBEDDING_MODEL = "text-embedding-3-small"
+# Upper bound on in-flight completions when fanning out many prompts at once.
+_MAX_CONCURRENCY = int(os.getenv("BOOKBRIDGE_OPENAI_MAX_CONCURRENCY") or 16)
+_CACHE_TTL_SECONDS = float(os.getenv("BOOKBRIDGE_OPENAI_CACHE_TTL") or 3600)
+_CACHE_MAX_ENTRIES = int(os.getenv("BOOKBRIDGE_OPENAI_CACHE_SIZE") or 4096)
+_SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("BOOKBRIDGE_SEMANTIC_CACHE_SIZE") or 10_000)
+_SEMANTIC_CACHE_ENABLED = (os.getenv("BOOKBRIDGE_SEMANTIC_CACHE") or "1") != "0"
+_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("BOOKBRIDGE_SEMANTIC_CACHE_THRESHOLD") or 0.87)
+# Optional pickle file the semantic cache is restored from at startup and saved to on shutdown.
+_SEMANTIC_CACHE_PATH = os.getenv("BOOKBRIDGE_SEMANTIC_CACHE_PATH")
+# Completion requests per minute to stay under; 429s that still slip through are retried
+# with backoff by the SDK itself. 0 disables client-side throttling.
+_RATE_LIMIT_RPM = float(os.getenv("BOOKBRIDGE_OPENAI_RPM") or 500)
+# Callers that would queue longer than this fail fast with RateLimitExceeded instead.
+_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("BOOKBRIDGE_OPENAI_RATE_LIMIT_MAX_WAIT") or 5)
+_RATE_LIMITER: Optional[TokenBucket] = (
+    TokenBucket.per_minute(_RATE_LIMIT_RPM, max_wait=_RATE_LIMIT_MAX_WAIT_SECONDS)
+    if _RATE_LIMIT_RPM > 0
+    else None
+)
+
+# SQLite-backed copy of the exact-match layer that survives restarts; "" disables it.
+_DISK_CACHE_DIR = os.getenv("BOOKBRIDGE_OPENAI_DISK_CACHE_DIR", "/tmp/bookbridge_cache/openai")
+_DISK_CACHE_TTL_SECONDS = float(os.getenv("BOOKBRIDGE_OPENAI_DISK_CACHE_TTL") or 7 * 24 * 3600)
+# Opened on first use so importing this module never touches the filesystem.
+_disk_cache: Optional[Cache] = None
+_EXACT_CACHE: ExactMatchCache[List[Dict[str, str]]] = ExactMatchCache(
+    maxsize=_CACHE_MAX_ENTRIES, ttl=_CACHE_TTL_SECONDS
+)
+_SEMANTIC_CACHE: SemanticCache[List[Dict[str, str]]] = SemanticCache(
+    maxsize=_SEMANTIC_CACHE_MAX_ENTRIES, ttl=_CACHE_TTL_SECONDS, threshold=_SEMANTIC_CACHE_THRESHOLD
+)
+
+_SYSTEM_INSTRUCTION = (
+    "You are a recommender that suggests books a reader is most likely to enjoy. "
+    "Return 5 to 10 distinct books ordered from best match to least match. "
+    "For each item, output only the canonical book title—no author names, series labels, subtitles, punctuation, or extra text. "
+    "All titles must be in English; when a book is known by a non-English title, provide its common English title instead."
+)
+# Shared by every request; the SDK only reads the messages it is given.
+_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": _SYSTEM_INSTRUCTION}
+
+
+class BookRecommendation(BaseModel):
+    title: str
+
+
+# Structured-output schema: the SDK sends it as a strict json_schema and parses the
+# reply straight into these models.
+class BookRecommendations(BaseModel):
+    # 5-10 items is enforced by the schema sent to OpenAI, not on parse, so a short list
+    # still yields its usable titles. The item2vec rerank fills the rest of the top 10.
+    recommendations: List[BookRecommendation] = Field(
+        json_schema_extra={"minItems": 5, "maxItems": 10}
+    )
+
+
+class PromptRecommendations(BookRecommendations):
+    prompt_index: int
+
+
+class BatchBookRecommendations(BaseModel):
+    results: List[PromptRecommendations]
+
+
+_BATCH_INSTRUCTION = (
+    "You will receive several numbered requests from different readers. "
+    "Answer each one independently and return one results entry per request, "
+    "ordered by prompt_index (the request number)."
+)
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def _strict_json_schema(node: Any) -> Any:
+    """Close every object in a pydantic JSON schema, as OpenAI's strict mode requires."""
+    if isinstance(node, dict):
+        node = {key: _strict_json_schema(value) for key, value in node.items()}
+        if node.get("type") == "object":
+            node["additionalProperties"] = False
+    elif isinstance(node, list):
+        node = [_strict_json_schema(value) for value in node]
+    return node
+
+
+# Batch API request bodies are plain JSON, so the schema is sent in its wire form. It is
+# built here rather than with the SDK's private openai.lib._parsing helpers, which can
+# change on any SDK upgrade.
+_BATCH_API_RESPONSE_FORMAT = {
     "type": "json_schema",
     "json_schema": {
-        "name": "book_recommendations",
-        "schema": {
-            "type": "object",
-            "properties": {
-                "recommendations": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {"title": {"type": "string"}},
-                        "required": ["title"],
-                        "additionalProperties": False,
-                    },
-                    "minItems": 10,
-                    "maxItems": 10,
-                }
-            },
-            "required": ["recommendations"],
-            "additionalProperties": False,
-        },
+        "name": BookRecommendations.__name__,
+        "schema": _strict_json_schema(BookRecommendations.model_json_schema()),
         "strict": True,
     },
 }
+_BATCH_API_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+_BATCH_API_POLL_SECONDS = float(os.getenv("BOOKBRIDGE_BATCH_POLL_SECONDS") or 10)
+_BATCH_API_MAX_POLL_SECONDS = float(os.getenv("BOOKBRIDGE_BATCH_MAX_POLL_SECONDS") or 300)
+
+
+def _normalize_history(history: Optional[List[str]]) -> List[str]:
+    """Accept a single string or a list of entries and drop empty ones."""
+    if not history:
+        return []
+    if isinstance(history, str):
+        return [history]
+    # The usual input is already clean; reuse it rather than copying (nothing mutates it).
+    if isinstance(history, list) and all(isinstance(entry, str) and entry for entry in history):
+        return history
+    return [str(entry) for entry in history if entry]
+
+
+def _cache_key(history_items: List[str], prompt: str) -> str:
+    """
+    Hash the request into an exact-match cache key.
+
+    Inputs are lowercased with whitespace collapsed so trivial variants share an entry.
+    ``str.split`` also strips ``\x1f``, so the separator cannot occur inside a part.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    parts = (_DEFAULT_MODEL, _SYSTEM_INSTRUCTION, str(len(history_items)), *history_items, prompt)
+    for part in parts:
+        digest.update(" ".join(part.split()).lower().encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def get_openai_client() -> OpenAI:
+    """Return the shared, pooled sync OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            http_client=DefaultHttpxClient(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+        )
+    return _client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the shared, pooled async OpenAI client, creating it on first use."""
+    global _aclient
+    if _aclient is None:
+        _aclient = AsyncOpenAI(
+            http_client=DefaultAsyncHttpxClient(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+        )
+    return _aclient
 
 
-def _extract_text_content(message_content: Any) -> str:
-    """Normalize OpenAI chat message content into a plain string."""
-    if message_content is None:
-        raise ValueError("OpenAI response contained no message content.")
-    if isinstance(message_content, str):
-        return message_content
+def _history_scope(history_items: List[str]) -> str:
+    """Digest the history so semantic matches only reuse results for the same context."""
+    return hashlib.sha256(orjson.dumps(sorted(history_items))).hexdigest()
 
-    parts: List[str] = []
-    for part in message_content:
-        text = getattr(part, "text", None)
-        if text:
-            parts.append(text)
 
-    if not parts:
-        raise ValueError("OpenAI response missing text content.")
-    return "".join(parts)
+def _semantic_text(history_items: List[str], prompt: str) -> str:
+    """Text embedded for the semantic cache: order-insensitive history followed by the prompt."""
+    return "\n".join([*sorted(history_items), prompt])
+
+
+@functools.lru_cache(maxsize=2048)
+def _embed_prompt(text: str) -> np.ndarray:
+    """L2-normalised embedding of ``text``, memoised so every consumer shares one API call.
+
+    The shared float32 vector is read-only so callers cannot corrupt the cached copy;
+    failures raise and are therefore never cached.
+    """
+    response = get_openai_client().embeddings.create(model=_EMBEDDING_MODEL, input=text)
+    vector = normalize_embedding(response.data[0].embedding)
+    vector.setflags(write=False)
+    return vector
 
 
-def _clean_title(title: Any) -> Optional[str]:
-    """Strip noise from a title and drop invalid entries."""
-    if not isinstance(title, str):
+def _embed_text(text: str) -> Optional[np.ndarray]:
+    """Embed text for the semantic cache; failures disable the lookup rather than the request."""
+    try:
+        return _embed_prompt(text)
+    except Exception as exc:
+        LOG.warning("Skipping semantic cache; embedding failed: %s", exc)
         return None
-    cleaned = " ".join(title.split()).strip(" ,;:{}[]\"'")
-    return cleaned or None
 
 
-def _clean_recommendations(recommendations: Any) -> List[Dict[str, str]]:
-    """Ensure recommendations are well-formed and titles are tidy."""
-    if not isinstance(recommendations, list):
-        return []
+async def _aembed_text(text: str) -> Optional[np.ndarray]:
+    """Async counterpart of ``_embed_text``; misses run in a thread to share the memo."""
+    return await asyncio.to_thread(_embed_text, text)
 
-    cleaned: List[Dict[str, str]] = []
-    for rec in recommendations:
-        raw_title = rec.get("title") if isinstance(rec, dict) else rec
-        title = _clean_title(raw_title)
-        if title:
-            cleaned.append({"title": title})
+
+def _get_disk_cache() -> Optional[Cache]:
+    """Return the shared disk cache, opening it on first use; ``None`` when disabled."""
+    global _disk_cache
+    if _disk_cache is None and _DISK_CACHE_DIR:
+        _disk_cache = Cache(_DISK_CACHE_DIR)
+    return _disk_cache
+
+
+def _exact_lookup(cache_key: str) -> Optional[List[Dict[str, str]]]:
+    """Check the in-process cache, then the disk cache (promoting disk hits into memory)."""
+    cached = _EXACT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        disk_cache = _get_disk_cache()
+        blob = disk_cache.get(cache_key) if disk_cache is not None else None
+    except Exception as exc:
+        LOG.warning("Skipping disk cache; read failed: %s", exc)
+        return None
+    if blob is None:
+        return None
+    cached = orjson.loads(blob)
+    _EXACT_CACHE.put(cache_key, cached)
+    return cached
+
+
+def _store_exact(cache_key: str, cleaned: List[Dict[str, str]]) -> None:
+    _EXACT_CACHE.put(cache_key, cleaned)
+    try:
+        disk_cache = _get_disk_cache()
+        if disk_cache is not None:
+            disk_cache.set(cache_key, orjson.dumps(cleaned), expire=_DISK_CACHE_TTL_SECONDS)
+    except Exception as exc:
+        LOG.warning("Failed to write disk cache: %s", exc)
+
+
+def _semantic_lookup(
+    cache_key: str, embedding: Optional[np.ndarray], scope: str
+) -> Optional[List[Dict[str, str]]]:
+    """Return a semantically similar cached result, backfilling the exact-match layer."""
+    if embedding is None:
+        return None
+    cached = _SEMANTIC_CACHE.get(embedding, scope)
+    if cached is not None:
+        _store_exact(cache_key, cached)
+    return cached
+
+
+def _remember(
+    cache_key: str, embedding: Optional[np.ndarray], scope: str, cleaned: List[Dict[str, str]]
+) -> None:
+    _store_exact(cache_key, cleaned)
+    if embedding is not None:
+        _SEMANTIC_CACHE.put(embedding, scope, cleaned)
+
+
+def restore_semantic_cache() -> None:
+    """Warm the semantic cache from ``BOOKBRIDGE_SEMANTIC_CACHE_PATH`` when it exists."""
+    if not (_SEMANTIC_CACHE_ENABLED and _SEMANTIC_CACHE_PATH and os.path.exists(_SEMANTIC_CACHE_PATH)):
+        return
+    try:
+        loaded = _SEMANTIC_CACHE.load(_SEMANTIC_CACHE_PATH)
+    except Exception as exc:
+        LOG.warning("Ignoring unreadable semantic cache %s: %s", _SEMANTIC_CACHE_PATH, exc)
+        return
+    LOG.info("Restored %d semantic cache entries from %s", loaded, _SEMANTIC_CACHE_PATH)
+
+
+def persist_semantic_cache() -> None:
+    """Save the semantic cache to ``BOOKBRIDGE_SEMANTIC_CACHE_PATH`` for the next start."""
+    if not (_SEMANTIC_CACHE_ENABLED and _SEMANTIC_CACHE_PATH):
+        return
+    try:
+        saved = _SEMANTIC_CACHE.save(_SEMANTIC_CACHE_PATH)
+    except Exception as exc:
+        LOG.warning("Failed to save semantic cache to %s: %s", _SEMANTIC_CACHE_PATH, exc)
+        return
+    LOG.info("Saved %d semantic cache entries to %s", saved, _SEMANTIC_CACHE_PATH)
+
+
+def _history_context(history_items: List[str]) -> str:
+    context = "\n".join(f"- {entry}" for entry in history_items)
+    return f"Previous reader context:\n{context}"
+
+
+def _completion_kwargs(history_items: List[str], prompt: str) -> Dict[str, Any]:
+    messages: List[Dict[str, str]] = [_SYSTEM_MESSAGE]
+    if history_items:
+        # One message for all history avoids paying a message envelope per entry.
+        messages.append({"role": "user", "content": _history_context(history_items)})
+    messages.append({"role": "user", "content": prompt})
+    return {
+        "model": _DEFAULT_MODEL,
+        "temperature": 0.4,
+        "messages": messages,
+        "response_format": BookRecommendations,
+    }
+
+
+def _validate_content(content: str | bytes) -> BookRecommendations:
+    """
+    Parse and validate raw JSON content against ``BookRecommendations``.
+
+    The model's validator is compiled by pydantic-core when the class is defined, so
+    parsing and schema checks run in a single native pass with no per-call schema work.
+    """
+    try:
+        return BookRecommendations.model_validate_json(content)
+    except ValidationError as exc:
+        raise ValueError(f"OpenAI response did not match the recommendations schema: {exc}") from exc
+
+
+def _parsed_message(response: Any, schema: Type[SchemaT]) -> SchemaT:
+    """Return the structured output the SDK parsed into ``schema``."""
+    message = response.choices[0].message
+    parsed: Optional[SchemaT] = message.parsed
+    if parsed is None:
+        if message.refusal:
+            raise ValueError(f"OpenAI refused to recommend books: {message.refusal}")
+        raise RuntimeError("Structured output missing .parsed; upgrade the openai SDK.")
+    return parsed
+
+
+def _responses_kwargs(history_items: List[str], prompt: str) -> Dict[str, Any]:
+    # Same turns as the chat path; the static system message leads so it forms the cached prefix.
+    kwargs = _completion_kwargs(history_items, prompt)
+    return {
+        "model": kwargs["model"],
+        "temperature": kwargs["temperature"],
+        "input": kwargs["messages"],
+        "text_format": BookRecommendations,
+    }
+
+
+def _parsed_output(response: Any) -> BookRecommendations:
+    """Return the structured output of a ``responses.parse`` result."""
+    parsed: Optional[BookRecommendations] = response.output_parsed
+    if parsed is not None:
+        return parsed
+    for item in response.output:
+        for part in getattr(item, "content", None) or []:
+            if getattr(part, "type", None) == "refusal":
+                raise ValueError(f"OpenAI refused to recommend books: {part.refusal}")
+    raise RuntimeError("Structured output missing .output_parsed; upgrade the openai SDK.")
+
+
+def _throttle() -> None:
+    if _RATE_LIMITER is not None:
+        _RATE_LIMITER.acquire()
+
+
+async def _athrottle() -> None:
+    if _RATE_LIMITER is not None:
+        await _RATE_LIMITER.aacquire()
+
+
+def _request_recommendations(history_items: List[str], prompt: str) -> BookRecommendations:
+    client = get_openai_client()
+    if _USE_RESPONSES_API:
+        return _parsed_output(client.responses.parse(**_responses_kwargs(history_items, prompt)))
+    response = client.beta.chat.completions.parse(**_completion_kwargs(history_items, prompt))
+    return _parsed_message(response, BookRecommendations)
+
+
+async def _arequest_recommendations(history_items: List[str], prompt: str) -> BookRecommendations:
+    client = get_async_openai_client()
+    if _USE_RESPONSES_API:
+        parsed_response = await client.responses.parse(**_responses_kwargs(history_items, prompt))
+        return _parsed_output(parsed_response)
+    completion = await client.beta.chat.completions.parse(**_completion_kwargs(history_items, prompt))
+    return _parsed_message(completion, BookRecommendations)
+
+
+def _parse_response(parsed: BookRecommendations) -> List[Dict[str, str]]:
+    """Clean the parsed recommendations, rejecting replies with no usable titles."""
+    cleaned = _clean_recommendations(parsed.recommendations)
+
+    if not cleaned:
+        raise ValueError("OpenAI response did not return a recommendations list.")
     return cleaned
 
 
+_RECOMMENDATIONS_ARRAY_RE = re.compile(r'"recommendations"\s*:\s*\[')
+
+
+class _IncrementalRecommendations:
+    """Pull complete ``{"title": ...}`` items out of a JSON reply as it streams in."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> List[Any]:
+        """Append streamed text and return the raw titles of any newly completed items."""
+        self._buffer += text
+        if self._pos is None:
+            match = _RECOMMENDATIONS_ARRAY_RE.search(self._buffer)
+            if match is None:
+                return []
+            self._pos = match.end()
+
+        titles: List[Any] = []
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer) or buffer[pos] != "{":
+                break
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # the item is still arriving
+            pos = end
+            if isinstance(item, dict):
+                titles.append(item.get("title"))
+        self._pos = pos
+        return titles
+
+
 def generate_book_candidates(prompt: str, history: Optional[List[str]] = None) -> List[Dict[str, str]]:
     """
-    Generate 10 ordered book recommendations for the given user prompt.
+    Generate up to 10 ordered book recommendations for the given user prompt.
 
     Returns:
         A list of clean recommendation dicts sorted from most to least recommended.
     """
-    system_instruction = (
-        "You are a recommender that suggests books a reader is most likely to enjoy. "
-        "Return exactly 10 distinct books ordered from best match to least match. "
-        "For each item, output only the canonical book title—no author names, series labels, subtitles, punctuation, or extra text. "
-        "All titles must be in English; when a book is known by a non-English title, provide its common English title instead."
-    )
+    history_items = _normalize_history(history)
+    cache_key = _cache_key(history_items, prompt)
+    cached = _exact_lookup(cache_key)
+    if cached is not None:
+        return [dict(rec) for rec in cached]
 
-    messages: List[Dict[str, str]] = [{"role": "system", "content": system_instruction}]
-    history_items: List[str] = []
-    if history:
-        if isinstance(history, str):
-            history_items = [history]
-        else:
-            history_items = list(history)
+    scope = _history_scope(history_items)
+    embedding = _embed_text(_semantic_text(history_items, prompt)) if _SEMANTIC_CACHE_ENABLED else None
+    cached = _semantic_lookup(cache_key, embedding, scope)
+    if cached is not None:
+        return [dict(rec) for rec in cached]
 
-    for entry in history_items:
-        if not entry:
-            continue
-        messages.append({"role": "user", "content": str(entry)})
+    _throttle()
+    cleaned = _parse_response(_request_recommendations(history_items, prompt))
+    _remember(cache_key, embedding, scope, cleaned)
+    return [dict(rec) for rec in cleaned]
 
-    messages.append({"role": "user", "content": prompt})
 
-    response = _client.chat.completions.create(
-        model=_DEFAULT_MODEL,
-        temperature=0.4,
-        messages=messages,
-        response_format=_RESPONSE_FORMAT,
+async def agenerate_book_candidates(
+    prompt: str, history: Optional[List[str]] = None
+) -> List[Dict[str, str]]:
+    """Async variant of ``generate_book_candidates`` for callers already on an event loop."""
+    history_items = _normalize_history(history)
+    cache_key = _cache_key(history_items, prompt)
+    cached = _exact_lookup(cache_key)
+    if cached is not None:
+        return [dict(rec) for rec in cached]
+
+    scope = _history_scope(history_items)
+    embedding = (
+        await _aembed_text(_semantic_text(history_items, prompt)) if _SEMANTIC_CACHE_ENABLED else None
     )
+    cached = _semantic_lookup(cache_key, embedding, scope)
+    if cached is not None:
+        return [dict(rec) for rec in cached]
+
+    await _athrottle()
+    cleaned = _parse_response(await _arequest_recommendations(history_items, prompt))
+    _remember(cache_key, embedding, scope, cleaned)
+    return [dict(rec) for rec in cleaned]
+
+
+async def generate_book_candidates_many(
+    prompts: Sequence[str], history: Optional[List[str]] = None
+) -> List[List[Dict[str, str]]]:
+    """
+    Run ``agenerate_book_candidates`` for several prompts concurrently.
+
+    At most ``BOOKBRIDGE_OPENAI_MAX_CONCURRENCY`` calls are in flight, so wall time
+    is close to the slowest call rather than the sum. Results keep the input order.
+    """
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENCY)
+
+    async def _bounded(prompt: str) -> List[Dict[str, str]]:
+        async with semaphore:
+            return await agenerate_book_candidates(prompt, history=history)
+
+    return list(await asyncio.gather(*(_bounded(prompt) for prompt in prompts)))
 
-    message = response.choices[0].message
-    parsed = getattr(message, "parsed", None)
-    if parsed is None:
-        content = _extract_text_content(message.content)
-        parsed = json.loads(content)
-    recommendations = parsed.get("recommendations", [])
 
-    cleaned = _clean_recommendations(recommendations)
+async def _astream_titles(history_items: List[str], prompt: str) -> AsyncGenerator[str, None]:
+    """Yield cleaned titles as their JSON objects close, from whichever API is enabled."""
+    client = get_async_openai_client()
+    if _USE_RESPONSES_API:
+        manager: Any = client.responses.stream(**_responses_kwargs(history_items, prompt))
+        delta_type = "response.output_text.delta"
+    else:
+        manager = client.beta.chat.completions.stream(**_completion_kwargs(history_items, prompt))
+        delta_type = "content.delta"
+    parser = _IncrementalRecommendations()
+    async with manager as stream:
+        async for event in stream:
+            if event.type != delta_type:
+                continue
+            for raw_title in parser.feed(event.delta):
+                if title := _clean_title(raw_title):
+                    yield title
+
+
+async def astream_book_candidates(
+    prompt: str, history: Optional[List[str]] = None
+) -> AsyncIterator[Dict[str, str]]:
+    """
+    Yield cleaned recommendations one by one while the completion is still streaming.
+
+    Each title is emitted as soon as its JSON object closes, so callers can start
+    downstream work before the last token arrives. Cache hits are replayed directly.
+    If the stream fails before yielding anything, the non-streaming call is used instead.
+    """
+    history_items = _normalize_history(history)
+    cache_key = _cache_key(history_items, prompt)
+    embedding: Optional[np.ndarray] = None
+    scope = ""
+    cached = _exact_lookup(cache_key)
+    if cached is None:
+        scope = _history_scope(history_items)
+        embedding = (
+            await _aembed_text(_semantic_text(history_items, prompt)) if _SEMANTIC_CACHE_ENABLED else None
+        )
+        cached = _semantic_lookup(cache_key, embedding, scope)
+    if cached is not None:
+        for rec in cached:
+            yield dict(rec)
+        return
+
+    cleaned: List[Dict[str, str]] = []
+    # One token covers the stream and, if it fails early, the non-streaming retry.
+    await _athrottle()
+    try:
+        async with aclosing(_astream_titles(history_items, prompt)) as titles:
+            async for title in titles:
+                cleaned.append({"title": title})
+                yield {"title": title}
+                if len(cleaned) >= MAX_RECOMMENDATIONS:
+                    break
+    except Exception as exc:
+        if cleaned:
+            raise
+        LOG.warning("Streaming completion failed (%s); retrying without streaming", exc)
+        cleaned = _parse_response(await _arequest_recommendations(history_items, prompt))
+        _remember(cache_key, embedding, scope, cleaned)
+        for rec in cleaned:
+            yield dict(rec)
+        return
 
     if not cleaned:
         raise ValueError("OpenAI response did not return a recommendations list.")
+    _remember(cache_key, embedding, scope, cleaned)
 
-    return cleaned
+
+def _batch_completion_kwargs(requests: Sequence[tuple[List[str], str]]) -> Dict[str, Any]:
+    sections = [_BATCH_INSTRUCTION]
+    for index, (history_items, prompt) in enumerate(requests, start=1):
+        lines = [f"Request {index}:"]
+        if history_items:
+            lines.append(_history_context(history_items))
+        lines.append(prompt)
+        sections.append("\n".join(lines))
+    return {
+        "model": _DEFAULT_MODEL,
+        "temperature": 0.4,
+        "messages": [_SYSTEM_MESSAGE, {"role": "user", "content": "\n\n".join(sections)}],
+        "response_format": BatchBookRecommendations,
+    }
+
+
+def generate_book_candidates_batch(
+    prompts: Sequence[str], histories: Optional[Sequence[Optional[List[str]]]] = None
+) -> List[List[Dict[str, str]]]:
+    """
+    Generate recommendations for several prompts with a single chat completion.
+
+    The system instruction and schema are sent once for the whole batch instead of once
+    per prompt. Exact-cache hits are served without being sent, and any prompt the
+    batched reply leaves without usable titles is retried through
+    ``generate_book_candidates``. Results keep the input order.
+    """
+    if histories is None:
+        histories = [None] * len(prompts)
+    if len(histories) != len(prompts):
+        raise ValueError("prompts and histories must have the same length.")
+
+    history_lists = [_normalize_history(history) for history in histories]
+    keys = [_cache_key(items, prompt) for items, prompt in zip(history_lists, prompts)]
+    results: List[Optional[List[Dict[str, str]]]] = [_exact_lookup(key) for key in keys]
+    pending = [idx for idx, cached in enumerate(results) if cached is None]
+
+    if len(pending) > 1:
+        _throttle()
+        response = get_openai_client().beta.chat.completions.parse(
+            **_batch_completion_kwargs([(history_lists[idx], prompts[idx]) for idx in pending])
+        )
+        for entry in _parsed_message(response, BatchBookRecommendations).results:
+            if not 1 <= entry.prompt_index <= len(pending):
+                continue
+            idx = pending[entry.prompt_index - 1]
+            cleaned = _clean_recommendations(entry.recommendations)
+            if cleaned and results[idx] is None:
+                results[idx] = cleaned
+                _store_exact(keys[idx], cleaned)
+
+    resolved: List[List[Dict[str, str]]] = []
+    for idx, recs in enumerate(results):
+        if recs is None:
+            recs = generate_book_candidates(prompts[idx], history=history_lists[idx])
+        resolved.append([dict(rec) for rec in recs])
+    return resolved
+
+
+def _batch_api_line(custom_id: str, history_items: List[str], prompt: str) -> bytes:
+    body = {**_completion_kwargs(history_items, prompt), "response_format": _BATCH_API_RESPONSE_FORMAT}
+    return orjson.dumps(
+        {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+    )
+
+
+def _parse_batch_api_output(text: str) -> Dict[str, List[Dict[str, str]]]:
+    """Map ``custom_id`` to cleaned recommendations for every successful output line."""
+    results: Dict[str, List[Dict[str, str]]] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            LOG.warning("Batch request %s failed: %s", custom_id, record.get("error") or response)
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            cleaned = _clean_recommendations(_validate_content(content).recommendations)
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            LOG.warning("Batch request %s returned an unusable reply: %s", custom_id, exc)
+            continue
+        if cleaned:
+            results[custom_id] = cleaned
+    return results
+
+
+def generate_book_candidates_batch_api(
+    prompts: Sequence[str], histories: Optional[Sequence[Optional[List[str]]]] = None
+) -> List[Optional[List[Dict[str, str]]]]:
+    """
+    Generate recommendations for many prompts through the OpenAI Batch API.
+
+    Meant for offline jobs (catalog enrichment, nightly refreshes): batch requests are
+    billed at half price and draw on a separate rate-limit pool, but may take up to 24h.
+    The call blocks while polling with exponential backoff. Prompts whose request failed
+    come back as ``None``; results keep the input order.
+    """
+    if histories is None:
+        histories = [None] * len(prompts)
+    if len(histories) != len(prompts):
+        raise ValueError("prompts and histories must have the same length.")
+
+    custom_ids = [f"prompt-{idx}" for idx in range(len(prompts))]
+    payload = b"\n".join(
+        _batch_api_line(custom_id, _normalize_history(history), prompt)
+        for custom_id, history, prompt in zip(custom_ids, histories, prompts)
+    )
+    client = get_openai_client()
+    input_file = client.files.create(file=("bookbridge_batch.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+    )
+    LOG.info("Submitted batch %s with %d prompts", batch.id, len(prompts))
+
+    delay = _BATCH_API_POLL_SECONDS
+    while batch.status not in _BATCH_API_TERMINAL_STATUSES:
+        time.sleep(delay)
+        delay = min(delay * 2, _BATCH_API_MAX_POLL_SECONDS)
+        batch = client.batches.retrieve(batch.id)
+
+    # Expired batches still publish whatever finished before the window closed.
+    if not batch.output_file_id:
+        raise RuntimeError(f"OpenAI batch {batch.id} ended with status {batch.status!r} and no output.")
+    results = _parse_batch_api_output(client.files.content(batch.output_file_id).text)
+    return [results.get(custom_id) for custom_id in custom_ids]
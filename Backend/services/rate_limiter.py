@@ -0,0 +1,63 @@
+"""Client-side token bucket that keeps OpenAI traffic under its rate limits."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a token would not free up within the bucket's ``max_wait``."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded; retry after {retry_after:.1f}s.")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by sync and async callers.
+
+    Callers reserve a token up front and sleep off any deficit, so waiters are served
+    in arrival order and a burst is smoothed to ``rate`` instead of tripping 429s.
+    Under sustained overload the queue is capped: a caller that would wait longer than
+    ``max_wait`` gets ``RateLimitExceeded`` instead of a token.
+    """
+
+    def __init__(self, *, rate: float, capacity: float, max_wait: float = float("inf")) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive.")
+        self._rate = rate
+        self._capacity = capacity
+        self._max_wait = max_wait
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests: float, *, max_wait: float = float("inf")) -> "TokenBucket":
+        """Bucket for a requests-per-minute budget, allowing one second's worth of burst."""
+        rate = requests / 60.0
+        return cls(rate=rate, capacity=max(1.0, rate), max_wait=max_wait)
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            delay = max(0.0, (1.0 - self._tokens) / self._rate)
+            if delay > self._max_wait:
+                raise RateLimitExceeded(delay)
+            self._tokens -= 1.0
+            return delay
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
@@ -0,0 +1,179 @@
+"""In-process caches for OpenAI recommendation responses."""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+V = TypeVar("V")
+
+
+class ExactMatchCache(Generic[V]):
+    """Thread-safe LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[V]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticCache(Generic[V]):
+    """
+    Nearest-neighbour cache over L2-normalized embeddings.
+
+    Embeddings live in one preallocated float32 matrix, so a lookup is a single
+    matrix-vector product against every live entry. Only entries recorded under the
+    same ``scope`` are eligible to match. When full, an expired slot or else the
+    least recently used one is overwritten.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float, threshold: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._threshold = threshold
+        self._vectors: Optional[np.ndarray] = None
+        self._expires_at = np.zeros(maxsize, dtype=np.float64)
+        self._last_used = np.zeros(maxsize, dtype=np.float64)
+        self._scopes: List[Optional[str]] = [None] * maxsize
+        self._values: List[Optional[V]] = [None] * maxsize
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def get(self, embedding: np.ndarray, scope: str) -> Optional[V]:
+        with self._lock:
+            if self._vectors is None or self._count == 0:
+                return None
+            if embedding.shape[0] != self._vectors.shape[1]:
+                return None
+            now = time.monotonic()
+            similarities = self._vectors[: self._count] @ embedding
+            live = self._expires_at[: self._count] > now
+            candidates = np.flatnonzero(live & (similarities >= self._threshold))
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                if self._scopes[slot] == scope:
+                    self._last_used[slot] = now
+                    return self._values[slot]
+            return None
+
+    def put(self, embedding: np.ndarray, scope: str, value: V) -> None:
+        with self._lock:
+            self._put(embedding, scope, value, self._ttl)
+
+    def _put(self, embedding: np.ndarray, scope: str, value: V, ttl: float) -> None:
+        if self._vectors is None or self._vectors.shape[1] != embedding.shape[0]:
+            self._vectors = np.zeros((self._maxsize, embedding.shape[0]), dtype=np.float32)
+            self._count = 0
+        now = time.monotonic()
+        if self._count < self._maxsize:
+            slot = self._count
+            self._count += 1
+        else:
+            recency = np.where(self._expires_at > now, self._last_used, -np.inf)
+            slot = int(np.argmin(recency))
+        self._vectors[slot] = embedding
+        self._expires_at[slot] = now + ttl
+        self._last_used[slot] = now
+        self._scopes[slot] = scope
+        self._values[slot] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._scopes = [None] * self._maxsize
+            self._values = [None] * self._maxsize
+            self._count = 0
+
+    def save(self, path: Path | str) -> int:
+        """Pickle the live entries to ``path`` (atomically) and return how many were written."""
+        with self._lock:
+            now = time.monotonic()
+            vectors = self._vectors
+            entries = []
+            if vectors is not None:
+                live = self._expires_at[: self._count] > now
+                # Oldest first, so reloading into a smaller cache keeps the most recent entries.
+                slots = np.flatnonzero(live)
+                slots = slots[np.argsort(self._last_used[slots], kind="stable")]
+                entries = [
+                    (
+                        vectors[slot].copy(),
+                        self._scopes[slot],
+                        self._values[slot],
+                        self._expires_at[slot] - now,
+                    )
+                    for slot in slots.tolist()
+                ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per process, so workers shutting down together never share one.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(entries, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return len(entries)
+
+    def load(self, path: Path | str) -> int:
+        """Add entries written by ``save``, keeping their remaining TTL; returns the count loaded."""
+        with Path(path).open("rb") as handle:
+            entries = pickle.load(handle)
+        loaded = 0
+        with self._lock:
+            for embedding, scope, value, ttl_left in entries:
+                if ttl_left > 0:
+                    vector = np.asarray(embedding, dtype=np.float32)
+                    self._put(vector, scope, value, min(ttl_left, self._ttl))
+                    loaded += 1
+        return loaded
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def normalize_embedding(values: List[float]) -> np.ndarray:
+    """Convert raw embedding values to a unit-length float32 vector."""
+    vector = np.asarray(values, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
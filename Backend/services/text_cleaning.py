@@ -0,0 +1,41 @@
+"""
+Title cleanup applied to every OpenAI recommendation.
+
+Kept free of third-party imports and fully annotated so the container build can
+compile it with mypyc; the pure-Python module is used wherever no compiled
+extension is present.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Protocol
+
+
+class HasTitle(Protocol):
+    title: Any
+
+
+TITLE_TRIM_CHARS = " ,;:{}[]\"'"
+# Matches the schema's maxItems; anything past it is never used downstream.
+MAX_RECOMMENDATIONS = 10
+
+
+def clean_title(title: Any) -> Optional[str]:
+    """Strip noise from a title and drop invalid entries."""
+    if not isinstance(title, str):
+        return None
+    # split/join collapses whitespace in C and beats re.sub(r"\s+", " ", ...) on short titles.
+    cleaned = " ".join(title.split()).strip(TITLE_TRIM_CHARS)
+    return cleaned or None
+
+
+def clean_recommendations(recommendations: Iterable[HasTitle]) -> List[Dict[str, str]]:
+    """Tidy titles, drop entries that are empty after cleaning, and keep at most 10."""
+    cleaned: List[Dict[str, str]] = []
+    for rec in recommendations:
+        title = clean_title(rec.title)
+        if title:
+            cleaned.append({"title": title})
+            if len(cleaned) == MAX_RECOMMENDATIONS:
+                break
+    return cleaned
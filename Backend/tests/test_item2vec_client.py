@@ -1,7 +1,13 @@
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import faiss
+import numpy as np
+from google.api_core.exceptions import NotFound
+import pyarrow as pa
 import pytest
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -12,13 +18,17 @@ from services import item2vec_client as i2v
 
 
 class FakeBlob:
-    def __init__(self, name: str, exists: bool = True):
+    def __init__(self, name: str, exists: bool = True, size: int = 16):
         self.name = name
         self._exists = exists
+        self.size = None
+        self._size = size
         self.downloaded_to: list[Path] = []
 
-    def exists(self) -> bool:
-        return self._exists
+    def reload(self) -> None:
+        if not self._exists:
+            raise NotFound(self.name)
+        self.size = self._size
 
     def download_to_filename(self, destination: Path) -> None:
         destination = Path(destination)
@@ -54,25 +64,29 @@ class FakeClient:
         return self._bucket
 
 
-class FakeVectors:
-    def __init__(self, neighbors_by_key: dict[str, list[tuple[str, float]]]):
-        self._neighbors = neighbors_by_key
-        self.key_to_index = {key: idx for idx, key in enumerate(neighbors_by_key)}
-
-    def most_similar(self, key: str, topn: int = 10):
-        return self._neighbors.get(key, [])[:topn]
+def make_item_vectors(vectors_by_key: dict[str, list[float]]) -> i2v.ItemVectors:
+    keys = list(vectors_by_key)
+    matrix = np.asarray([vectors_by_key[key] for key in keys], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return i2v.ItemVectors(
+        vectors=matrix, index_to_key=keys, key_to_index={key: idx for idx, key in enumerate(keys)}
+    )
 
 
 def test_download_item2vec_assets_hits_gcs(monkeypatch, tmp_path):
     # Arrange defaults to point at temp cache.
     monkeypatch.setattr(i2v, "DEFAULT_CACHE_DIR", tmp_path / "cache")
     monkeypatch.setattr(i2v, "DEFAULT_BUCKET", "book_bridge")
-    monkeypatch.setattr(i2v, "DEFAULT_EMBEDDINGS_BLOB", "models/item_embeddings.kv")
+    monkeypatch.setattr(i2v, "DEFAULT_VECTORS_BLOB", "models/item_vectors.npy")
+    monkeypatch.setattr(i2v, "DEFAULT_VECTOR_KEYS_BLOB", "models/item_keys.json")
+    monkeypatch.setattr(i2v, "DEFAULT_HNSW_INDEX_BLOB", "models/item_vectors.hnsw")
     monkeypatch.setattr(i2v, "DEFAULT_TITLE_INDEX_BLOB", "models/title_to_id.json")
     monkeypatch.setattr(i2v, "DEFAULT_METADATA_PREFIX", "filtered_metadata")
 
     blobs = {
-        "models/item_embeddings.kv": FakeBlob("models/item_embeddings.kv"),
+        "models/item_vectors.npy": FakeBlob("models/item_vectors.npy"),
+        "models/item_keys.json": FakeBlob("models/item_keys.json"),
+        "models/item_vectors.hnsw": FakeBlob("models/item_vectors.hnsw"),
         "models/title_to_id.json": FakeBlob("models/title_to_id.json"),
         "filtered_metadata/meta.json": FakeBlob("filtered_metadata/meta.json"),
     }
@@ -83,11 +97,15 @@ def test_download_item2vec_assets_hits_gcs(monkeypatch, tmp_path):
 
     # Ensures client.bucket called and downloads executed.
     assert client.bucket_names == ["book_bridge"]
-    assert Path(blobs["models/item_embeddings.kv"].downloaded_to[0]).exists()
+    assert Path(blobs["models/item_vectors.npy"].downloaded_to[0]).exists()
+    assert Path(blobs["models/item_keys.json"].downloaded_to[0]).exists()
+    assert Path(blobs["models/item_vectors.hnsw"].downloaded_to[0]).exists()
     assert Path(blobs["models/title_to_id.json"].downloaded_to[0]).exists()
     assert Path(blobs["filtered_metadata/meta.json"].downloaded_to[0]).exists()
     # Returned paths should match cache layout.
-    assert assets.embeddings_path.name == "item_embeddings.kv"
+    assert assets.vectors_path.name == "item_vectors.npy"
+    assert assets.vector_keys_path.name == "item_keys.json"
+    assert assets.ann_index_path.name == "item_vectors.hnsw"
     assert assets.title_index_path.name == "title_to_id.json"
     assert assets.metadata_dir.name == "filtered_metadata"
 
@@ -95,14 +113,18 @@ def test_download_item2vec_assets_hits_gcs(monkeypatch, tmp_path):
 def test_download_item2vec_assets_uses_cache_when_present(monkeypatch, tmp_path):
     monkeypatch.setattr(i2v, "DEFAULT_CACHE_DIR", tmp_path / "cache")
     monkeypatch.setattr(i2v, "DEFAULT_BUCKET", "book_bridge")
-    monkeypatch.setattr(i2v, "DEFAULT_EMBEDDINGS_BLOB", "models/item_embeddings.kv")
+    monkeypatch.setattr(i2v, "DEFAULT_VECTORS_BLOB", "models/item_vectors.npy")
+    monkeypatch.setattr(i2v, "DEFAULT_VECTOR_KEYS_BLOB", "models/item_keys.json")
+    monkeypatch.setattr(i2v, "DEFAULT_HNSW_INDEX_BLOB", "models/item_vectors.hnsw")
     monkeypatch.setattr(i2v, "DEFAULT_TITLE_INDEX_BLOB", "models/title_to_id.json")
     monkeypatch.setattr(i2v, "DEFAULT_METADATA_PREFIX", "filtered_metadata")
 
     # Pre-create cached files to bypass downloads.
     cache_dir = i2v.DEFAULT_CACHE_DIR
     cache_dir.mkdir(parents=True, exist_ok=True)
-    (cache_dir / "item_embeddings.kv").write_text("cached-embed")
+    (cache_dir / "item_vectors.npy").write_text("cached-embed")
+    (cache_dir / "item_keys.json").write_text("[]")
+    (cache_dir / "item_vectors.hnsw").write_text("cached-hnsw")
     (cache_dir / "title_to_id.json").write_text("{}")
     meta_dir = cache_dir / "filtered_metadata"
     meta_dir.mkdir(parents=True, exist_ok=True)
@@ -117,7 +139,9 @@ def test_download_item2vec_assets_uses_cache_when_present(monkeypatch, tmp_path)
 
     assets = i2v.download_item2vec_assets(force=False, storage_client=FakeClient(FakeBucket({})))
 
-    assert assets.embeddings_path.read_text() == "cached-embed"
+    assert assets.vectors_path.read_text() == "cached-embed"
+    assert assets.vector_keys_path.read_text() == "[]"
+    assert assets.ann_index_path.read_text() == "cached-hnsw"
     assert assets.title_index_path.read_text() == "{}"
     assert (assets.metadata_dir / "meta.json").read_text() == "cached-meta"
 
@@ -138,6 +162,34 @@ def test_download_blob_if_needed_respects_force(monkeypatch, tmp_path):
     assert blob.downloaded_to != []
 
 
+def test_download_blob_if_needed_reports_missing_object(tmp_path):
+    bucket = FakeBucket({})
+
+    with pytest.raises(i2v.Item2VecError, match="not found"):
+        i2v._download_blob_if_needed(bucket, "models/missing.npy", tmp_path / "missing.npy", force=False)
+
+
+def test_download_blob_if_needed_chunks_large_objects(monkeypatch, tmp_path):
+    blob = FakeBlob("models/item_vectors.npy", size=2048)
+    bucket = FakeBucket({"models/item_vectors.npy": blob})
+    calls = []
+    monkeypatch.setattr(i2v, "DEFAULT_CHUNKED_DOWNLOAD_BYTES", 1024)
+    monkeypatch.setattr(
+        i2v.transfer_manager,
+        "download_chunks_concurrently",
+        lambda blob, filename, **kwargs: calls.append((blob, filename, kwargs)),
+    )
+
+    target = tmp_path / "item_vectors.npy"
+    i2v._download_blob_if_needed(bucket, "models/item_vectors.npy", target, force=False)
+
+    assert blob.downloaded_to == []
+    [(called_blob, filename, kwargs)] = calls
+    assert called_blob is blob
+    assert filename == str(target)
+    assert kwargs["worker_type"] == i2v.transfer_manager.THREAD
+
+
 def test_filter_existing_titles_dedupes_and_orders():
     title_index = {"dune": "ID1", "thewayofkings": "ID2"}
     recs = [{"title": "Dune"}, {"title": "Dune "}, {"title": "The Way of Kings"}]
@@ -147,37 +199,109 @@ def test_filter_existing_titles_dedupes_and_orders():
     assert result == ["ID1", "ID2"]
 
 
-def test_collect_similar_handles_missing_seed():
-    neighbors = {"A": [("B", 0.5)]}
-    model = FakeVectors(neighbors)
+def test_normalize_title_keeps_only_ascii_alphanumerics():
+    assert i2v._normalize_title("Harry Potter and the Sorcerer's Stone (Book 1)") == (
+        "harrypotterandthesorcerersstonebook1"
+    )
+    assert i2v._normalize_title("Les Misérables — Tome I") == "lesmisrablestomei"
+    assert i2v._normalize_title("") == ""
+
+
+def test_top_neighbors_excludes_seed_and_orders_by_similarity():
+    vectors = make_item_vectors(
+        {"A": [1.0, 0.0], "B": [0.6, 0.8], "C": [0.8, 0.6], "D": [-1.0, 0.0]}
+    )
+
+    rows, sims = i2v._top_neighbors(vectors.vectors, np.array([0]), topn=2)
+
+    assert [vectors.index_to_key[row] for row in rows[0]] == ["C", "B"]
+    assert np.allclose(sims[0], [0.8, 0.6])
+
+
+def make_hnsw_index(vectors: i2v.ItemVectors) -> faiss.Index:
+    index = faiss.IndexHNSWFlat(vectors.vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+    index.add(np.ascontiguousarray(vectors.vectors))
+    return index
+
+
+def test_ann_neighbors_matches_exact_search():
+    vectors = make_item_vectors(
+        {"A": [1.0, 0.0], "B": [0.6, 0.8], "C": [0.8, 0.6], "D": [-1.0, 0.0]}
+    )
+    index = make_hnsw_index(vectors)
+
+    rows, sims = i2v._ann_neighbors(index, vectors.vectors, np.array([0, 3]), topn=2)
+
+    assert [vectors.index_to_key[row] for row in rows[0]] == ["C", "B"]
+    assert np.allclose(sims[0], [0.8, 0.6])
+    assert 3 not in rows[1]
 
-    assert i2v._collect_similar(model, "MISSING", topn=5) == []
-    assert i2v._collect_similar(model, "A", topn=1) == [("B", 0.5)]
+
+def test_rerank_with_item2vec_uses_ann_index_when_loaded():
+    vectors = make_item_vectors(
+        {
+            "A": [1.0, 0.0, 0.0],
+            "B": [0.0, 1.0, 0.0],
+            "X": [0.95, 0.0, 0.31],
+            "C": [0.0, 0.85, 0.53],
+            "D": [0.0, 0.0, 1.0],
+        }
+    )
+    with_index = i2v.ItemVectors(
+        vectors=vectors.vectors,
+        index_to_key=vectors.index_to_key,
+        key_to_index=vectors.key_to_index,
+        ann_index=make_hnsw_index(vectors),
+    )
+
+    assert i2v.rerank_with_item2vec(["A", "B"], with_index, topn_per_seed=2, final_k=4) == [
+        "A",
+        "B",
+        "X",
+        "C",
+    ]
 
 
 def test_rerank_with_item2vec_simple_similarity_and_threshold():
-    neighbors = {
-        "A": [("X", 0.9), ("B", 0.1)],
-        "B": [("X", 0.2), ("C", 0.8)],
-    }
-    model = FakeVectors(neighbors)
+    vectors = make_item_vectors(
+        {
+            "A": [1.0, 0.0, 0.0],
+            "B": [0.0, 1.0, 0.0],
+            "X": [0.95, 0.0, 0.31],
+            "C": [0.0, 0.85, 0.53],
+            "D": [0.0, 0.0, 1.0],
+        }
+    )
 
-    ranked = i2v.rerank_with_item2vec(["A", "B"], model, topn_per_seed=2, final_k=4)
+    ranked = i2v.rerank_with_item2vec(["A", "B", "MISSING"], vectors, topn_per_seed=2, final_k=4)
 
-    # Seeds included (similarity 1.0), low-sim items filtered (<0.8), and ties broken by id.
-    assert ranked == ["A", "B", "X", "C"]
+    # Seeds included (similarity 1.0), low-sim items filtered (<0.8), and ties broken by order.
+    assert ranked == ["A", "B", "MISSING", "X"]
+    assert i2v.rerank_with_item2vec(["A", "B"], vectors, topn_per_seed=2, final_k=4) == [
+        "A",
+        "B",
+        "X",
+        "C",
+    ]
 
 
 def test_recommend_book_ids_full_pipeline(monkeypatch):
     assets = i2v.Item2VecAssets(
         metadata_dir=Path("/tmp/metadata"),
         title_index_path=Path("/tmp/title_to_id.json"),
-        embeddings_path=Path("/tmp/item_embeddings.kv"),
+        vectors_path=Path("/tmp/item_vectors.npy"),
+        vector_keys_path=Path("/tmp/item_keys.json"),
     )
 
     monkeypatch.setattr(i2v, "download_item2vec_assets", lambda force=False: assets)
     monkeypatch.setattr(i2v, "load_title_index", lambda path: {"dune": "BOOK_DUNE"})
-    monkeypatch.setattr(i2v, "load_embeddings", lambda path: FakeVectors({"BOOK_DUNE": [("BOOK_X", 0.8)]}))
+    monkeypatch.setattr(
+        i2v,
+        "load_item_vectors",
+        lambda vectors_path, keys_path, ann_index_path=None: make_item_vectors(
+            {"BOOK_DUNE": [1.0, 0.0], "BOOK_X": [0.9, 0.1], "BOOK_Y": [0.0, 1.0]}
+        ),
+    )
 
     recs = [{"title": "Dune"}, {"title": "Unknown"}]
 
@@ -190,7 +314,8 @@ def test_recommend_book_ids_returns_empty_when_no_matches(monkeypatch):
     assets = i2v.Item2VecAssets(
         metadata_dir=Path("/tmp/metadata"),
         title_index_path=Path("/tmp/title_to_id.json"),
-        embeddings_path=Path("/tmp/item_embeddings.kv"),
+        vectors_path=Path("/tmp/item_vectors.npy"),
+        vector_keys_path=Path("/tmp/item_keys.json"),
     )
     monkeypatch.setattr(i2v, "download_item2vec_assets", lambda force=False: assets)
     monkeypatch.setattr(i2v, "load_title_index", lambda path: {})
@@ -216,7 +341,8 @@ def test_get_book_details_uses_metadata(monkeypatch, tmp_path):
     assets = i2v.Item2VecAssets(
         metadata_dir=meta_dir,
         title_index_path=Path("/tmp/title_to_id.json"),
-        embeddings_path=Path("/tmp/item_embeddings.kv"),
+        vectors_path=Path("/tmp/item_vectors.npy"),
+        vector_keys_path=Path("/tmp/item_keys.json"),
     )
 
     monkeypatch.setattr(
@@ -235,3 +361,200 @@ def test_get_book_details_uses_metadata(monkeypatch, tmp_path):
     # Missing book gets defaults and preserved asin.
     assert details[1]["asin"] == "BOOK2"
     assert details[1]["title"] == "Unknown Title"
+
+
+def test_warm_item2vec_assets_loads_every_asset(monkeypatch):
+    assets = i2v.Item2VecAssets(
+        metadata_dir=Path("/tmp/metadata"),
+        title_index_path=Path("/tmp/title_to_id.json"),
+        vectors_path=Path("/tmp/item_vectors.npy"),
+        vector_keys_path=Path("/tmp/item_keys.json"),
+    )
+    loaded: list[Path] = []
+
+    monkeypatch.setattr(
+        i2v, "download_item2vec_assets", lambda force=False, include_metadata=True: assets
+    )
+    monkeypatch.setattr(i2v, "load_title_index", loaded.append)
+    monkeypatch.setattr(
+        i2v, "load_item_vectors", lambda vectors_path, keys_path, ann_index_path=None: loaded.append(vectors_path)
+    )
+    monkeypatch.setattr(i2v, "load_metadata_index", loaded.append)
+
+    assert i2v.warm_item2vec_assets() == assets
+    assert loaded == [assets.title_index_path, assets.vectors_path, assets.metadata_dir]
+
+
+def test_load_metadata_index_skips_malformed_lines(tmp_path):
+    meta_dir = tmp_path / "metadata"
+    meta_dir.mkdir()
+    good = {"asin": "BOOK1", "title": "Title One", "description": ["long text"]}
+    (meta_dir / "part-000.json").write_text(json.dumps(good) + "\n{not json\n")
+    (meta_dir / "part-001.json").write_text("")
+
+    i2v.load_metadata_index.cache_clear()
+    index = i2v.load_metadata_index(meta_dir)
+    i2v.load_metadata_index.cache_clear()
+
+    assert list(index) == ["BOOK1"]
+    assert index["BOOK1"].title == "Title One"
+
+
+def test_load_metadata_index_defaults_fields_missing_from_a_record(tmp_path):
+    meta_dir = tmp_path / "metadata"
+    meta_dir.mkdir()
+    records = [
+        {"asin": "BOOK1", "title": "Title One", "author_name": "Author A"},
+        {"asin": "BOOK2"},
+    ]
+    (meta_dir / "part-000.json").write_text("\n".join(json.dumps(r) for r in records) + "\n")
+
+    i2v.load_metadata_index.cache_clear()
+    index = i2v.load_metadata_index(meta_dir)
+    i2v.load_metadata_index.cache_clear()
+
+    assert index["BOOK2"] == i2v.BookRow("Unknown Title", "Unknown Author", None, None, None)
+
+
+def test_load_metadata_index_memory_maps_compiled_table(tmp_path):
+    meta_dir = tmp_path / "metadata"
+    meta_dir.mkdir()
+    shard = meta_dir / "part-000.json"
+    shard.write_text(json.dumps({"asin": "BOOK1", "title": "Old Title"}) + "\n")
+
+    i2v.load_metadata_index.cache_clear()
+    i2v.load_metadata_index(meta_dir)
+    i2v.load_metadata_index.cache_clear()
+    table_path = tmp_path / "metadata.arrow"
+    assert table_path.exists()
+
+    # A newer shard triggers a rebuild of the table.
+    shard.write_text(json.dumps({"asin": "BOOK1", "title": "New Title"}) + "\n")
+    os.utime(table_path, (0, 0))
+    index = i2v.load_metadata_index(meta_dir)
+    i2v.load_metadata_index.cache_clear()
+
+    assert index["BOOK1"].title == "New Title"
+    assert index.rows(["MISSING", "BOOK1"]) == [
+        i2v.BookRow("Unknown Title", "Unknown Author", None, None, None),
+        i2v.BookRow("New Title", "Unknown Author", None, None, None),
+    ]
+
+
+def test_build_metadata_table_tolerates_concurrent_builders(tmp_path):
+    meta_dir = tmp_path / "metadata"
+    meta_dir.mkdir()
+    shard = meta_dir / "part-000.json"
+    shard.write_text(json.dumps({"asin": "BOOK1", "title": "Title One"}) + "\n")
+    table_path = tmp_path / "metadata.arrow"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [
+            pool.submit(i2v._build_metadata_table, meta_dir, [shard], table_path) for _ in range(8)
+        ]
+        for future in futures:
+            future.result()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["metadata", "metadata.arrow"]
+    assert pa.ipc.open_file(str(table_path)).read_all().column("title").to_pylist() == ["Title One"]
+
+
+def test_download_prefix_if_needed_fetches_every_shard(tmp_path):
+    names = [f"filtered_metadata/part-{i:03d}.json" for i in range(5)]
+    blobs = {name: FakeBlob(name) for name in names}
+    blobs["filtered_metadata/"] = FakeBlob("filtered_metadata/")
+    bucket = FakeBucket(blobs)
+
+    i2v._download_prefix_if_needed(bucket, "filtered_metadata", tmp_path / "meta", force=False)
+
+    assert sorted(p.name for p in (tmp_path / "meta").iterdir()) == [Path(n).name for n in names]
+    assert blobs["filtered_metadata/"].downloaded_to == []
+
+
+def test_download_prefix_if_needed_surfaces_shard_failure(tmp_path):
+    class BrokenBlob(FakeBlob):
+        def download_to_filename(self, destination: Path) -> None:
+            raise OSError("connection reset")
+
+    bucket = FakeBucket({"filtered_metadata/part-000.json": BrokenBlob("filtered_metadata/part-000.json")})
+
+    with pytest.raises(i2v.Item2VecError):
+        i2v._download_prefix_if_needed(bucket, "filtered_metadata", tmp_path / "meta", force=False)
+
+
+def test_load_title_index_compiles_trie(tmp_path):
+    index_path = tmp_path / "title_to_id.json"
+    index_path.write_text(json.dumps({"dune": "ID1", "thewayofkings": "ID2"}))
+
+    i2v.load_title_index.cache_clear()
+    index = i2v.load_title_index(index_path)
+    i2v.load_title_index.cache_clear()
+
+    assert (tmp_path / "title_to_id.marisa").exists()
+    assert index.get("dune") == "ID1"
+    assert index["thewayofkings"] == "ID2"
+    assert index.get("missing") is None
+    assert len(index) == 2
+    assert i2v.filter_existing_titles(["Dune", "Unknown"], index) == ["ID1"]
+
+
+def test_build_title_trie_tolerates_concurrent_builders(tmp_path):
+    index_path = tmp_path / "title_to_id.json"
+    index_path.write_text(json.dumps({"dune": "ID1"}))
+    trie_path = tmp_path / "title_to_id.marisa"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for future in [pool.submit(i2v._build_title_trie, index_path, trie_path) for _ in range(8)]:
+            future.result()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["title_to_id.json", "title_to_id.marisa"]
+
+
+def test_load_item_vectors_memory_maps_export(tmp_path):
+    vectors_path = tmp_path / "item_vectors.npy"
+    keys_path = tmp_path / "item_keys.json"
+    np.save(vectors_path, np.eye(3, dtype=np.float32))
+    keys_path.write_text(json.dumps(["A", "B", "C"]))
+
+    i2v.load_item_vectors.cache_clear()
+    vectors = i2v.load_item_vectors(vectors_path, keys_path)
+    i2v.load_item_vectors.cache_clear()
+
+    assert isinstance(vectors.vectors, np.memmap)
+    assert vectors.key_to_index == {"A": 0, "B": 1, "C": 2}
+    assert i2v.rerank_with_item2vec(["B"], vectors, final_k=2) == ["B"]
+
+
+def test_load_item_vectors_rejects_misaligned_keys(tmp_path):
+    vectors_path = tmp_path / "item_vectors.npy"
+    keys_path = tmp_path / "item_keys.json"
+    np.save(vectors_path, np.eye(3, dtype=np.float32))
+    keys_path.write_text(json.dumps(["A", "B"]))
+
+    i2v.load_item_vectors.cache_clear()
+    with pytest.raises(i2v.Item2VecError):
+        i2v.load_item_vectors(vectors_path, keys_path)
+    i2v.load_item_vectors.cache_clear()
+
+
+def test_load_item_vectors_loads_hnsw_index(tmp_path):
+    vectors_path = tmp_path / "item_vectors.npy"
+    keys_path = tmp_path / "item_keys.json"
+    index_path = tmp_path / "item_vectors.hnsw"
+    np.save(vectors_path, np.eye(3, dtype=np.float32))
+    keys_path.write_text(json.dumps(["A", "B", "C"]))
+    index = faiss.IndexHNSWFlat(3, 32, faiss.METRIC_INNER_PRODUCT)
+    index.add(np.eye(2, 3, dtype=np.float32))
+    faiss.write_index(index, str(index_path))
+
+    i2v.load_item_vectors.cache_clear()
+    with pytest.raises(i2v.Item2VecError):
+        i2v.load_item_vectors(vectors_path, keys_path, index_path)
+    i2v.load_item_vectors.cache_clear()
+
+    index.add(np.eye(3, dtype=np.float32)[2:])
+    faiss.write_index(index, str(index_path))
+    vectors = i2v.load_item_vectors(vectors_path, keys_path, index_path)
+    i2v.load_item_vectors.cache_clear()
+
+    assert vectors.ann_index.ntotal == 3
@@ -0,0 +1,50 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+for path in (ROOT_DIR, ROOT_DIR / "api"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from api import main
+
+
+@pytest.fixture
+def warmup_gate(monkeypatch):
+    gate = threading.Event()
+    monkeypatch.setattr(main, "warm_item2vec_assets", gate.wait)
+    monkeypatch.setattr(main, "restore_semantic_cache", lambda: None)
+    monkeypatch.setattr(main, "persist_semantic_cache", lambda: None)
+    yield gate
+    gate.set()
+
+
+def test_ready_reports_warming_until_assets_load(monkeypatch, warmup_gate):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    with TestClient(main.app) as client:
+        assert client.get("/health").json() == {"status": "ok"}
+        resp = client.get("/ready")
+        assert resp.status_code == 503
+        assert resp.json() == {"status": "warming"}
+
+        warmup_gate.set()
+        deadline = time.monotonic() + 5
+        while (resp := client.get("/ready")).status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ready"}
+
+
+def test_startup_fails_without_openai_api_key(monkeypatch, warmup_gate):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    with pytest.raises(RuntimeError, match="OPENAI_API_KEY"):
+        with TestClient(main.app):
+            pass
@@ -1,19 +1,27 @@
+import asyncio
+import json
 import sys
 from pathlib import Path
 from typing import Any, Dict
 
+import numpy as np
 import pytest
+from diskcache import Cache
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from services import openai_client
+from services.response_cache import ExactMatchCache, SemanticCache
+
+_get_disk_cache = openai_client._get_disk_cache
 
 
 class FakeMessage:
-    def __init__(self, parsed: Any = None, content: Any = None):
+    def __init__(self, parsed: Any = None, refusal: Any = None, content: Any = None):
         self.parsed = parsed
+        self.refusal = refusal
         self.content = content
 
 
@@ -27,29 +35,55 @@ class FakeResponse:
         self.choices = [FakeChoice(message)]
 
 
-def make_fake_client(create_impl):
+def make_parsed(*titles: str) -> openai_client.BookRecommendations:
+    return openai_client.BookRecommendations(recommendations=[{"title": title} for title in titles])
+
+
+def make_fake_client(parse_impl, *, is_async: bool = False):
     class FakeCompletions:
-        def create(self, **kwargs):
-            return create_impl(**kwargs)
+        def parse(self, **kwargs):
+            if is_async:
+                return _resolve(parse_impl(**kwargs))
+            return parse_impl(**kwargs)
 
     class FakeChat:
         def __init__(self):
             self.completions = FakeCompletions()
 
-    class FakeClient:
+    class FakeBeta:
         def __init__(self):
             self.chat = FakeChat()
 
+    class FakeClient:
+        def __init__(self):
+            self.beta = FakeBeta()
+
     return FakeClient()
 
 
+async def _resolve(value):
+    return value
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(openai_client, "_EXACT_CACHE", ExactMatchCache(maxsize=16, ttl=60))
+    monkeypatch.setattr(openai_client, "_get_disk_cache", lambda: None)
+    monkeypatch.setattr(openai_client, "_RATE_LIMITER", None)
+    monkeypatch.setattr(
+        openai_client, "_SEMANTIC_CACHE", SemanticCache(maxsize=16, ttl=60, threshold=0.92)
+    )
+    monkeypatch.setattr(openai_client, "_SEMANTIC_CACHE_ENABLED", False)
+    monkeypatch.setattr(openai_client, "_USE_RESPONSES_API", False)
+
+
 def test_generate_book_candidates_success(monkeypatch):
     captured: Dict[str, Any] = {}
 
     def fake_create(**kwargs):
         captured["kwargs"] = kwargs
         return FakeResponse(
-            FakeMessage(parsed={"recommendations": [{"title": "Dune "}, {"title": "The Way of Kings"}]})
+            FakeMessage(parsed=make_parsed("Dune ", "The Way of Kings"))
         )
 
     monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
@@ -62,8 +96,13 @@ def test_generate_book_candidates_success(monkeypatch):
     messages = captured["kwargs"]["messages"]
     assert messages[0]["role"] == "system"
     assert messages[-1]["content"] == "Give me sci-fi epics."
-    # History is threaded as user messages before the final prompt.
-    assert any(msg.get("content") == "User liked Foundation" for msg in messages)
+    assert captured["kwargs"]["response_format"] is openai_client.BookRecommendations
+    # History is collapsed into a single user message before the final prompt.
+    assert len(messages) == 3
+    assert messages[1] == {
+        "role": "user",
+        "content": "Previous reader context:\n- User liked Foundation\n- User enjoyed Mistborn",
+    }
 
 
 def test_generate_book_candidates_network_failure(monkeypatch):
@@ -78,8 +117,8 @@ def test_generate_book_candidates_network_failure(monkeypatch):
 
 def test_generate_book_candidates_bad_format(monkeypatch):
     def fake_create(**kwargs):
-        # recommendations is not a list -> cleaned becomes empty -> ValueError
-        return FakeResponse(FakeMessage(parsed={"recommendations": "not-a-list"}))
+        # every title is blank after cleaning -> cleaned becomes empty -> ValueError
+        return FakeResponse(FakeMessage(parsed=make_parsed(" ", "\"\"")))
 
     monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
 
@@ -87,19 +126,48 @@ def test_generate_book_candidates_bad_format(monkeypatch):
         openai_client.generate_book_candidates("Suggest books")
 
 
+def test_generate_book_candidates_surfaces_refusal(monkeypatch):
+    def fake_create(**kwargs):
+        return FakeResponse(FakeMessage(parsed=None, refusal="I can't help with that."))
+
+    monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
+
+    with pytest.raises(ValueError, match="can't help"):
+        openai_client.generate_book_candidates("Suggest books")
+
+
+def test_generate_book_candidates_requires_parsed_output(monkeypatch):
+    def fake_create(**kwargs):
+        return FakeResponse(FakeMessage(content='{"recommendations": [{"title": "Dune"}]}'))
+
+    monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
+
+    with pytest.raises(RuntimeError, match="parsed"):
+        openai_client.generate_book_candidates("Suggest books")
+
+
 def test_generate_book_candidates_accepts_history_string(monkeypatch):
     captured = {}
 
     def fake_create(**kwargs):
         captured["messages"] = kwargs["messages"]
-        return FakeResponse(FakeMessage(parsed={"recommendations": [{"title": "Dune"}]}))
+        return FakeResponse(FakeMessage(parsed=make_parsed("Dune")))
 
     monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
 
     result = openai_client.generate_book_candidates("Suggest books", history="Previous picks: Dune")
 
     assert result == [{"title": "Dune"}]
-    assert captured["messages"][1]["content"] == "Previous picks: Dune"
+    assert captured["messages"][1]["content"] == "Previous reader context:\n- Previous picks: Dune"
+
+
+def test_normalize_history_reuses_clean_lists():
+    history = ["Liked Dune", "Liked Emma"]
+
+    assert openai_client._normalize_history(history) is history
+    assert openai_client._normalize_history(["Liked Dune", "", 3]) == ["Liked Dune", "3"]
+    assert openai_client._normalize_history("Liked Dune") == ["Liked Dune"]
+    assert openai_client._normalize_history(None) == []
 
 
 def test_generate_book_candidates_without_history(monkeypatch):
@@ -107,7 +175,7 @@ def test_generate_book_candidates_without_history(monkeypatch):
 
     def fake_create(**kwargs):
         captured["messages"] = kwargs["messages"]
-        return FakeResponse(FakeMessage(parsed={"recommendations": [{"title": "Dune"}]}))
+        return FakeResponse(FakeMessage(parsed=make_parsed("Dune")))
 
     monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
 
@@ -118,3 +186,418 @@ def test_generate_book_candidates_without_history(monkeypatch):
     assert len(captured["messages"]) == 2
     assert captured["messages"][0]["role"] == "system"
     assert captured["messages"][1]["content"] == "Suggest books"
+
+
+def test_generate_book_candidates_uses_exact_cache(monkeypatch):
+    calls = []
+
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        return FakeResponse(FakeMessage(parsed=make_parsed("Dune")))
+
+    monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
+
+    first = openai_client.generate_book_candidates("Suggest books", history=["Liked Dune"])
+    # Case and whitespace variants share the entry.
+    second = openai_client.generate_book_candidates("  suggest   BOOKS", history=["liked dune "])
+    openai_client.generate_book_candidates("Suggest books")
+
+    assert first == second == [{"title": "Dune"}]
+    # Different history is a different cache entry.
+    assert len(calls) == 2
+
+
+def test_disk_cache_opens_on_first_use(monkeypatch, tmp_path):
+    # The autouse fixture stubs the accessor; exercise the real one here.
+    monkeypatch.setattr(openai_client, "_get_disk_cache", _get_disk_cache)
+    monkeypatch.setattr(openai_client, "_disk_cache", None)
+    monkeypatch.setattr(openai_client, "_DISK_CACHE_DIR", str(tmp_path / "openai"))
+    assert not (tmp_path / "openai").exists()
+
+    disk = openai_client._get_disk_cache()
+    try:
+        assert (tmp_path / "openai").exists()
+        assert openai_client._get_disk_cache() is disk
+    finally:
+        disk.close()
+
+    monkeypatch.setattr(openai_client, "_disk_cache", None)
+    monkeypatch.setattr(openai_client, "_DISK_CACHE_DIR", "")
+    assert openai_client._get_disk_cache() is None
+
+
+def test_generate_book_candidates_survives_restart_via_disk_cache(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        return FakeResponse(FakeMessage(parsed=make_parsed("Dune")))
+
+    monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
+    with Cache(str(tmp_path / "openai")) as disk:
+        monkeypatch.setattr(openai_client, "_get_disk_cache", lambda: disk)
+        first = openai_client.generate_book_candidates("Suggest books")
+        # A fresh process starts with an empty in-memory layer.
+        monkeypatch.setattr(openai_client, "_EXACT_CACHE", ExactMatchCache(maxsize=16, ttl=60))
+        second = openai_client.generate_book_candidates("Suggest books")
+
+    assert first == second == [{"title": "Dune"}]
+    assert len(calls) == 1
+
+
+def test_generate_book_candidates_uses_semantic_cache(monkeypatch):
+    calls = []
+
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        return FakeResponse(FakeMessage(parsed=make_parsed("Dune")))
+
+    embedded = []
+
+    def fake_embed(text):
+        embedded.append(text)
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    client = make_fake_client(fake_create)
+    monkeypatch.setattr(openai_client, "_client", client)
+    monkeypatch.setattr(openai_client, "_SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(openai_client, "_embed_text", fake_embed)
+
+    first = openai_client.generate_book_candidates("Suggest sci-fi books", history=["b", "a"])
+    second = openai_client.generate_book_candidates("Suggest some sci-fi books", history=["a", "b"])
+
+    assert first == second == [{"title": "Dune"}]
+    assert len(calls) == 1
+    # History is embedded with the prompt, independent of its order.
+    assert embedded == ["a\nb\nSuggest sci-fi books", "a\nb\nSuggest some sci-fi books"]
+
+
+def test_get_openai_client_is_created_lazily_and_reused(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai_client, "_client", None)
+
+    client = openai_client.get_openai_client()
+
+    assert client is openai_client.get_openai_client()
+    assert openai_client._client is client
+
+
+def test_embed_prompt_reuses_one_api_call_per_text(monkeypatch):
+    calls = []
+
+    class FakeEmbeddings:
+        def create(self, **kwargs):
+            calls.append(kwargs["input"])
+            return type("Resp", (), {"data": [type("Item", (), {"embedding": [3.0, 4.0]})()]})()
+
+    monkeypatch.setattr(openai_client, "_client", type("Client", (), {"embeddings": FakeEmbeddings()})())
+    openai_client._embed_prompt.cache_clear()
+    try:
+        first = openai_client._embed_prompt("cozy mysteries")
+        second = openai_client._embed_prompt("cozy mysteries")
+        vector = openai_client._embed_text("cozy mysteries")
+    finally:
+        openai_client._embed_prompt.cache_clear()
+
+    assert first is second is vector
+    assert vector.dtype == np.float32
+    assert vector.tolist() == pytest.approx([0.6, 0.8])
+    assert not vector.flags.writeable
+    assert calls == ["cozy mysteries"]
+
+
+def test_agenerate_book_candidates_awaits_async_client(monkeypatch):
+    captured = {}
+
+    def fake_create(**kwargs):
+        captured["messages"] = kwargs["messages"]
+        return FakeResponse(FakeMessage(parsed=make_parsed(" Dune")))
+
+    monkeypatch.setattr(openai_client, "_aclient", make_fake_client(fake_create, is_async=True))
+
+    result = asyncio.run(openai_client.agenerate_book_candidates("Suggest books", history=["h1"]))
+
+    assert result == [{"title": "Dune"}]
+    assert [msg["content"] for msg in captured["messages"][1:]] == [
+        "Previous reader context:\n- h1",
+        "Suggest books",
+    ]
+
+
+def test_generate_book_candidates_many_bounds_concurrency(monkeypatch):
+    in_flight = []
+    peak = []
+
+    async def fake_generate(prompt, history=None):
+        in_flight.append(prompt)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0)
+        in_flight.remove(prompt)
+        return [{"title": prompt}]
+
+    monkeypatch.setattr(openai_client, "agenerate_book_candidates", fake_generate)
+    monkeypatch.setattr(openai_client, "_MAX_CONCURRENCY", 2)
+
+    results = asyncio.run(openai_client.generate_book_candidates_many(["a", "b", "c", "d"]))
+
+    assert results == [[{"title": "a"}], [{"title": "b"}], [{"title": "c"}], [{"title": "d"}]]
+    assert max(peak) == 2
+
+
+def test_incremental_recommendations_emits_items_as_they_close():
+    parser = openai_client._IncrementalRecommendations()
+    chunks = [
+        '{"recommendations": [{"title": "Du',
+        'ne"}, {"title": "Hyperion, {b}',
+        '"}, {"title": "Emma"}',
+        "]}",
+    ]
+
+    assert [parser.feed(chunk) for chunk in chunks] == [[], ["Dune"], ["Hyperion, {b}", "Emma"], []]
+
+
+class FakeDelta:
+    def __init__(self, delta: str, event_type: str = "content.delta"):
+        self.type = event_type
+        self.delta = delta
+
+
+def make_fake_stream_client(chunks, *, fail: bool = False, event_type: str = "content.delta"):
+    class FakeStream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def __aiter__(self):
+            return self._events()
+
+        async def _events(self):
+            if fail:
+                raise RuntimeError("stream dropped")
+            for chunk in chunks:
+                yield FakeDelta(chunk, event_type)
+
+    client = make_fake_client(
+        lambda **kwargs: FakeResponse(FakeMessage(parsed=make_parsed("Fallback"))), is_async=True
+    )
+    client.beta.chat.completions.stream = lambda **kwargs: FakeStream()
+    client.responses = type("Responses", (), {"stream": staticmethod(lambda **kwargs: FakeStream())})()
+    return client
+
+
+def test_astream_book_candidates_yields_titles_and_caches(monkeypatch):
+    chunks = ['{"recommendations": [{"ti', 'tle": " Dune "}, {"title"', ': "Emma"}]}']
+    monkeypatch.setattr(openai_client, "_aclient", make_fake_stream_client(chunks))
+
+    async def collect(prompt):
+        return [rec async for rec in openai_client.astream_book_candidates(prompt)]
+
+    assert asyncio.run(collect("Suggest books")) == [{"title": "Dune"}, {"title": "Emma"}]
+    # Second call replays the cached result without streaming again.
+    monkeypatch.setattr(openai_client, "_aclient", make_fake_stream_client([], fail=True))
+    assert asyncio.run(collect("Suggest books")) == [{"title": "Dune"}, {"title": "Emma"}]
+
+
+def test_astream_book_candidates_falls_back_when_stream_fails(monkeypatch):
+    monkeypatch.setattr(openai_client, "_aclient", make_fake_stream_client([], fail=True))
+
+    async def collect():
+        return [rec async for rec in openai_client.astream_book_candidates("Suggest books")]
+
+    assert asyncio.run(collect()) == [{"title": "Fallback"}]
+
+
+def test_astream_book_candidates_uses_responses_api_when_enabled(monkeypatch):
+    chunks = ['{"recommendations": [{"title": "Dune"}', "]}"]
+    client = make_fake_stream_client(chunks, event_type="response.output_text.delta")
+    client.beta.chat.completions.stream = None  # must not be used
+    monkeypatch.setattr(openai_client, "_aclient", client)
+    monkeypatch.setattr(openai_client, "_USE_RESPONSES_API", True)
+
+    async def collect():
+        return [rec async for rec in openai_client.astream_book_candidates("Suggest books")]
+
+    assert asyncio.run(collect()) == [{"title": "Dune"}]
+
+
+def test_astream_book_candidates_stops_after_max_recommendations(monkeypatch):
+    items = ", ".join(json.dumps({"title": f"Book {idx}"}) for idx in range(12))
+    chunks = ['{"recommendations": [' + items + "]}"]
+    monkeypatch.setattr(openai_client, "_aclient", make_fake_stream_client(chunks))
+
+    async def collect():
+        return [rec async for rec in openai_client.astream_book_candidates("Suggest books")]
+
+    assert asyncio.run(collect()) == [{"title": f"Book {idx}"} for idx in range(10)]
+
+
+def test_astream_book_candidates_fallback_takes_one_rate_limit_token(monkeypatch):
+    acquired = []
+
+    class CountingLimiter:
+        async def aacquire(self):
+            acquired.append(1)
+
+    monkeypatch.setattr(openai_client, "_RATE_LIMITER", CountingLimiter())
+    monkeypatch.setattr(openai_client, "_aclient", make_fake_stream_client([], fail=True))
+
+    async def collect():
+        return [rec async for rec in openai_client.astream_book_candidates("Suggest books")]
+
+    assert asyncio.run(collect()) == [{"title": "Fallback"}]
+    assert len(acquired) == 1
+
+
+def test_generate_book_candidates_batch_sends_one_request(monkeypatch):
+    calls = []
+
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        if kwargs["response_format"] is openai_client.BookRecommendations:
+            return FakeResponse(FakeMessage(parsed=make_parsed("Retried")))
+        return FakeResponse(
+            FakeMessage(
+                parsed=openai_client.BatchBookRecommendations(
+                    results=[
+                        {"prompt_index": 2, "recommendations": [{"title": "Emma "}]},
+                        {"prompt_index": 1, "recommendations": [{"title": "Dune"}]},
+                        {"prompt_index": 3, "recommendations": [{"title": " "}]},
+                    ]
+                )
+            )
+        )
+
+    monkeypatch.setattr(openai_client, "_client", make_fake_client(fake_create))
+    openai_client._EXACT_CACHE.put(openai_client._cache_key([], "cached"), [{"title": "Cached"}])
+
+    results = openai_client.generate_book_candidates_batch(
+        ["sci-fi", "cached", "romance", "mystery"], [["Liked Foundation"], None, None, None]
+    )
+
+    assert results == [
+        [{"title": "Dune"}],
+        [{"title": "Cached"}],
+        [{"title": "Emma"}],
+        [{"title": "Retried"}],
+    ]
+    # One batched call for the three misses, plus a single-prompt retry for the empty result.
+    assert len(calls) == 2
+    batch_prompt = calls[0]["messages"][1]["content"]
+    assert "Request 1:\nPrevious reader context:\n- Liked Foundation\nsci-fi" in batch_prompt
+    assert "Request 3:\nmystery" in batch_prompt
+    assert calls[1]["messages"][-1]["content"] == "mystery"
+
+
+def test_generate_book_candidates_batch_api_submits_and_polls(monkeypatch):
+    class FakeBatch:
+        def __init__(self, status, output_file_id=None):
+            self.id = "batch_1"
+            self.status = status
+            self.output_file_id = output_file_id
+
+    class FakeFileContent:
+        text = "\n".join(
+            [
+                '{"custom_id": "prompt-1", "response": {"status_code": 200, "body": {"choices": '
+                '[{"message": {"content": "{\\"recommendations\\": [{\\"title\\": \\" Emma\\"}]}"}}]}}}',
+                '{"custom_id": "prompt-0", "response": {"status_code": 500, "body": {}}}',
+            ]
+        )
+
+    uploads = []
+    statuses = iter([FakeBatch("in_progress"), FakeBatch("completed", output_file_id="file_out")])
+
+    class FakeFiles:
+        def create(self, *, file, purpose):
+            uploads.append((file, purpose))
+            return type("Uploaded", (), {"id": "file_in"})()
+
+        def content(self, file_id):
+            assert file_id == "file_out"
+            return FakeFileContent()
+
+    class FakeBatches:
+        def create(self, *, input_file_id, endpoint, completion_window):
+            assert (input_file_id, endpoint) == ("file_in", "/v1/chat/completions")
+            return FakeBatch("validating")
+
+        def retrieve(self, batch_id):
+            return next(statuses)
+
+    client = type("Client", (), {"files": FakeFiles(), "batches": FakeBatches()})()
+    sleeps = []
+    monkeypatch.setattr(openai_client, "_client", client)
+    monkeypatch.setattr(openai_client.time, "sleep", sleeps.append)
+    monkeypatch.setattr(openai_client, "_BATCH_API_POLL_SECONDS", 1.0)
+
+    results = openai_client.generate_book_candidates_batch_api(["sci-fi", "romance"])
+
+    assert results == [None, [{"title": "Emma"}]]
+    assert sleeps == [1.0, 2.0]
+    (name, payload), purpose = uploads[0]
+    assert purpose == "batch"
+    lines = [json.loads(line) for line in payload.splitlines()]
+    assert [line["custom_id"] for line in lines] == ["prompt-0", "prompt-1"]
+    assert lines[1]["body"]["messages"][-1]["content"] == "romance"
+    response_format = lines[1]["body"]["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["strict"] is True
+    schema = response_format["json_schema"]["schema"]
+    assert schema["additionalProperties"] is False
+    assert schema["$defs"]["BookRecommendation"]["additionalProperties"] is False
+    assert schema["properties"]["recommendations"]["maxItems"] == 10
+
+
+class FakeParsedResponse:
+    def __init__(self, output_parsed: Any = None, output: Any = ()):
+        self.output_parsed = output_parsed
+        self.output = list(output)
+
+
+def make_fake_responses_client(parse_impl, *, is_async: bool = False):
+    class FakeResponses:
+        def parse(self, **kwargs):
+            if is_async:
+                return _resolve(parse_impl(**kwargs))
+            return parse_impl(**kwargs)
+
+    return type("Client", (), {"responses": FakeResponses()})()
+
+
+def test_generate_book_candidates_uses_responses_api(monkeypatch):
+    captured = {}
+
+    def fake_parse(**kwargs):
+        captured.update(kwargs)
+        return FakeParsedResponse(output_parsed=make_parsed(" Dune"))
+
+    monkeypatch.setattr(openai_client, "_USE_RESPONSES_API", True)
+    monkeypatch.setattr(openai_client, "_client", make_fake_responses_client(fake_parse))
+    monkeypatch.setattr(
+        openai_client, "_aclient", make_fake_responses_client(fake_parse, is_async=True)
+    )
+
+    assert openai_client.generate_book_candidates("Suggest books", history=["h1"]) == [
+        {"title": "Dune"}
+    ]
+    assert captured["text_format"] is openai_client.BookRecommendations
+    assert captured["input"][0] is openai_client._SYSTEM_MESSAGE
+    assert captured["input"][-1]["content"] == "Suggest books"
+    assert asyncio.run(openai_client.agenerate_book_candidates("Other books")) == [{"title": "Dune"}]
+
+
+def test_responses_api_surfaces_refusal(monkeypatch):
+    refusal = type("Part", (), {"type": "refusal", "refusal": "I can't help with that."})()
+    output = [type("Message", (), {"content": [refusal]})()]
+
+    monkeypatch.setattr(openai_client, "_USE_RESPONSES_API", True)
+    monkeypatch.setattr(
+        openai_client,
+        "_client",
+        make_fake_responses_client(lambda **kwargs: FakeParsedResponse(output=output)),
+    )
+
+    with pytest.raises(ValueError, match="can't help"):
+        openai_client.generate_book_candidates("Suggest books")
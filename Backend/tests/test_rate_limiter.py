@@ -0,0 +1,82 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from services import rate_limiter
+from services.rate_limiter import RateLimitExceeded, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_token_bucket_allows_burst_then_paces_to_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2.0)
+
+    for _ in range(4):
+        bucket.acquire()
+
+    assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_token_bucket_queues_concurrent_async_waiters(clock, monkeypatch):
+    delays = []
+
+    async def fake_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket.per_minute(60)
+
+    async def main():
+        await asyncio.gather(*(bucket.aacquire() for _ in range(3)))
+
+    asyncio.run(main())
+
+    assert delays == [pytest.approx(1.0), pytest.approx(2.0)]
+
+
+def test_token_bucket_fails_fast_past_max_wait(clock, monkeypatch):
+    # Concurrent callers: everyone queues at once, so the clock does not advance.
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleeps.append)
+    bucket = TokenBucket(rate=1.0, capacity=1.0, max_wait=2.0)
+
+    for _ in range(3):
+        bucket.acquire()
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        bucket.acquire()
+
+    assert excinfo.value.retry_after == pytest.approx(3.0)
+    assert clock.sleeps == [pytest.approx(1.0), pytest.approx(2.0)]
+    # A rejected caller takes no token, so the queue does not grow while overloaded.
+    clock.now += 1.0
+    bucket.acquire()
+    assert clock.sleeps[-1] == pytest.approx(2.0)
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
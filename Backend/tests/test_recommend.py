@@ -11,6 +11,11 @@ if str(ROOT_DIR) not in sys.path:
 
 from api.routers import recommend
 from services.item2vec_client import Item2VecError
+from services.rate_limiter import RateLimitExceeded
+
+
+async def _fake_candidates(prompt, history=None):
+    return [{"title": "Dune"}]
 
 
 def _build_app() -> TestClient:
@@ -22,9 +27,7 @@ def _build_app() -> TestClient:
 def test_recommend_books_returns_details(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
 
-    monkeypatch.setattr(
-        recommend, "generate_book_candidates", lambda prompt, history=None: [{"title": "Dune"}]
-    )
+    monkeypatch.setattr(recommend, "agenerate_book_candidates", _fake_candidates)
     monkeypatch.setattr(recommend, "get_final_book_ids", lambda recs: ["ID1", "ID2"])
     monkeypatch.setattr(
         recommend,
@@ -63,9 +66,7 @@ def test_recommend_books_returns_details(monkeypatch):
 def test_recommend_books_handles_item2vec_error(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
 
-    monkeypatch.setattr(
-        recommend, "generate_book_candidates", lambda prompt, history=None: [{"title": "Dune"}]
-    )
+    monkeypatch.setattr(recommend, "agenerate_book_candidates", _fake_candidates)
 
     def _raise(_recs):
         raise Item2VecError("boom")
@@ -76,3 +77,16 @@ def test_recommend_books_handles_item2vec_error(monkeypatch):
     resp = client.post("/recommendations", json={"prompt": "any"})
 
     assert resp.status_code == 502
+
+
+def test_recommend_books_sheds_load_when_rate_limited(monkeypatch):
+    async def _rate_limited(prompt, history=None):
+        raise RateLimitExceeded(2.5)
+
+    monkeypatch.setattr(recommend, "agenerate_book_candidates", _rate_limited)
+
+    client = _build_app()
+    resp = client.post("/recommendations", json={"prompt": "any"})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "3"
@@ -0,0 +1,94 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from services.response_cache import ExactMatchCache, SemanticCache, normalize_embedding
+
+
+def test_exact_match_cache_evicts_least_recently_used():
+    cache = ExactMatchCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_exact_match_cache_expires_entries():
+    cache = ExactMatchCache(maxsize=2, ttl=0)
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_semantic_cache_matches_above_threshold_within_scope():
+    cache = SemanticCache(maxsize=4, ttl=60, threshold=0.9)
+    cache.put(normalize_embedding([1.0, 0.0]), "scope", ["hit"])
+
+    assert cache.get(normalize_embedding([0.99, 0.05]), "scope") == ["hit"]
+    assert cache.get(normalize_embedding([0.99, 0.05]), "other-scope") is None
+    assert cache.get(normalize_embedding([0.0, 1.0]), "scope") is None
+
+
+def test_semantic_cache_overwrites_oldest_slot_when_full():
+    cache = SemanticCache(maxsize=2, ttl=60, threshold=0.99)
+    cache.put(normalize_embedding([1.0, 0.0, 0.0]), "s", "first")
+    cache.put(normalize_embedding([0.0, 1.0, 0.0]), "s", "second")
+    cache.put(normalize_embedding([0.0, 0.0, 1.0]), "s", "third")
+
+    assert len(cache) == 2
+    assert cache.get(normalize_embedding([1.0, 0.0, 0.0]), "s") is None
+    assert cache.get(np.array([0.0, 0.0, 1.0], dtype=np.float32), "s") == "third"
+
+
+def test_semantic_cache_evicts_least_recently_used_slot():
+    cache = SemanticCache(maxsize=2, ttl=60, threshold=0.99)
+    cache.put(normalize_embedding([1.0, 0.0, 0.0]), "s", "first")
+    cache.put(normalize_embedding([0.0, 1.0, 0.0]), "s", "second")
+    assert cache.get(normalize_embedding([1.0, 0.0, 0.0]), "s") == "first"
+    cache.put(normalize_embedding([0.0, 0.0, 1.0]), "s", "third")
+
+    assert cache.get(normalize_embedding([1.0, 0.0, 0.0]), "s") == "first"
+    assert cache.get(normalize_embedding([0.0, 1.0, 0.0]), "s") is None
+
+
+def test_semantic_cache_round_trips_through_disk(tmp_path):
+    path = tmp_path / "semantic.pkl"
+    cache = SemanticCache(maxsize=4, ttl=60, threshold=0.9)
+    cache.put(normalize_embedding([1.0, 0.0]), "scope", ["hit"])
+    assert cache.save(path) == 1
+
+    restored = SemanticCache(maxsize=4, ttl=60, threshold=0.9)
+    assert restored.load(path) == 1
+    assert restored.get(normalize_embedding([1.0, 0.0]), "scope") == ["hit"]
+
+    expired = SemanticCache(maxsize=4, ttl=0, threshold=0.9)
+    expired.put(normalize_embedding([1.0, 0.0]), "scope", ["stale"])
+    expired.save(path)
+    assert restored.load(path) == 0
+
+
+def test_semantic_cache_saves_concurrently_without_leftovers(tmp_path):
+    path = tmp_path / "semantic.pkl"
+    caches = []
+    for idx in range(8):
+        cache = SemanticCache(maxsize=4, ttl=60, threshold=0.9)
+        cache.put(normalize_embedding([1.0, 0.0]), "scope", [f"worker-{idx}"])
+        caches.append(cache)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(lambda cache: cache.save(path), caches)) == [1] * 8
+
+    assert [p.name for p in tmp_path.iterdir()] == ["semantic.pkl"]
+    restored = SemanticCache(maxsize=4, ttl=60, threshold=0.9)
+    assert restored.load(path) == 1
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from services.text_cleaning import clean_recommendations, clean_title
+
+
+class Rec:
+    def __init__(self, title):
+        self.title = title
+
+
+def test_clean_title_collapses_whitespace_and_trims_noise():
+    assert clean_title('  "The  Name of\tthe Wind", ') == "The Name of the Wind"
+    assert clean_title(" [] ") is None
+    assert clean_title(None) is None
+
+
+def test_clean_recommendations_drops_empty_titles():
+    recs = [Rec(" Dune "), Rec(""), Rec(42), Rec("Emma;")]
+
+    assert clean_recommendations(recs) == [{"title": "Dune"}, {"title": "Emma"}]
+
+
+def test_clean_recommendations_stops_after_ten_titles():
+    recs = [Rec(f"Book {idx}") for idx in range(12)]
+
+    assert [rec["title"] for rec in clean_recommendations(recs)] == [f"Book {idx}" for idx in range(10)]